@@ -70,6 +70,7 @@ DataValidation.game_table = game_table
 DataValidation.item_table = item_table
 DataValidation.location_table = location_table
 DataValidation.region_table = region_table
+DataValidation.category_table = category_table
 
 validation_errors = []
 
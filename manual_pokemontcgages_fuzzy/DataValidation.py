@@ -1,143 +1,141 @@
+import inspect
 import logging
+import os
 import re
 import json
+import sys
+from collections import Counter
+from hashlib import sha256
+from typing import Optional
+from Utils import cache_path
 from worlds.AutoWorld import World
 from BaseClasses import MultiWorld, ItemClassification
 
+# Part of the validation cache key (see getValidationCacheKey), along with the source of this module.
+# The source is only readable when it's shipped, so bump this too whenever the checks in runGenerationDataValidation change.
+VALIDATION_CACHE_VERSION = 2
+
 
 class ValidationError(Exception):
     pass
 
-class DataValidation():
-    game_table = {}
-    item_table = []
-    location_table = []
-    region_table = {}
-
-
-    @staticmethod
-    def checkItemNamesInLocationRequires():
-        for location in DataValidation.location_table:
-            if "requires" not in location:
-                continue
-
-            if isinstance(location["requires"], str):
-                # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', location["requires"]):
-                    if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
-                        continue
-                    else:
-                        # it's just a category, so ignore it
-                        if '@' in item:
-                            continue
-
-                        item = item.replace("|", "")
+class ValidationLookups():
+    """Name sets, name Counters and a category -> item names map, built once from the DataValidation tables
+    so that each check can look names up instead of scanning a whole table for every name it checks."""
+    def __init__(self, item_table: list, location_table: list, region_table: dict):
+        self.item_names = set(item["name"] for item in item_table)
+        self.item_name_counts = Counter(item["name"] for item in item_table)
+        self.location_name_counts = Counter(location["name"] for location in location_table)
+        self.region_names = set(region_table.keys())
+        self.category_to_item_names = {}
+
+        for item in item_table:
+            for category_name in item.get("category", []):
+                self.category_to_item_names.setdefault(category_name, set()).add(item["name"])
+
+        self.requires = RequiresIndex(location_table, region_table)
+
+class RequiresIndex():
+    """Every item name, category and ItemValue referenced by the location and region requires, found in one pass over them."""
+    def __init__(self, location_table: list, region_table: dict):
+        # (area type, area name, item names in the order they're referenced), for each location then region with requires
+        self.area_item_names: list[tuple[str, str, list[str]]] = []
+        # item name / category name -> [(area type, area name)] that reference it, locations first
+        self.item_references: dict[str, list[tuple[str, str]]] = {}
+        self.category_references: dict[str, list[tuple[str, str]]] = {}
+        # (area type, area name) -> {value name: highest count asked for}
+        self.area_value_requests: dict[tuple[str, str], dict[str, int]] = {}
+
+        for location in location_table:
+            if "requires" in location:
+                self.addRequires("location", location["name"], location["requires"])
+
+        for region_name, region in region_table.items():
+            if "requires" in region:
+                self.addRequires("region", region_name, region["requires"])
+
+    def addRequires(self, area_type: str, area_name: str, requires):
+        area = (area_type, area_name)
+        item_names = []
+
+        if isinstance(requires, str):
+            # parse user written statement into list of each item
+            for item in re.findall(r'\|[^|]+\|', requires):
+                if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
+                    continue
 
-                        item_parts = item.split(":")
-                        item_name = item
+                if '@' in item:
+                    self.category_references.setdefault(item.lstrip('|@$').rstrip('|').split(":")[0].strip(), []).append(area)
+                    continue
 
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
+                item_names.append(item.replace("|", "").split(":")[0])
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+        else:  # item access is in dict form
+            for item in requires:
+                # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
+                if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
+                    or_items = item["or"] if isinstance(item, dict) else item
+                    item_names.extend(or_item.split(":")[0] for or_item in or_items)
+                else:
+                    item_names.append(item.split(":")[0])
 
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
+        self.area_item_names.append((area_type, area_name, item_names))
+        for item_name in item_names:
+            references = self.item_references.setdefault(item_name, [])
+            if not references or references[-1] != area:
+                references.append(area)
 
-            else:  # item access is in dict form
-                for item in location["requires"]:
-                    # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-                    if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                        or_items = item
+        # the ItemValue regex expects a string, and for the dict form that's the json of it
+        self.area_value_requests[area] = DataValidation._checkLocationRequiresForItemValueWithRegex(
+            {}, requires if isinstance(requires, str) else json.dumps(requires)
+        )
 
-                        if isinstance(item, dict):
-                            or_items = item["or"]
+    def getValueRequests(self, areas: Optional[list[tuple[str, str]]] = None) -> dict[str, int]:
+        """Returns the highest count asked for of each ItemValue by the given (area type, area name) areas, or by every area if areas is None."""
+        values_requested = {}
 
-                        for or_item in or_items:
-                            or_item_parts = or_item.split(":")
-                            or_item_name = or_item
+        for area in (self.area_value_requests if areas is None else areas):
+            for value, count in self.area_value_requests.get(area, {}).items():
+                values_requested[value] = max(values_requested.get(value, 0), count)
 
-                            if len(or_item_parts) > 1:
-                                or_item_name = or_item_parts[0]
+        return values_requested
 
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
+# Passing results are cached by getValidationCacheKey, so changing a check here also means bumping VALIDATION_CACHE_VERSION
+class DataValidation():
+    game_table = {}
+    item_table = []
+    location_table = []
+    region_table = {}
+    category_table = {}
+    lookups: Optional[ValidationLookups] = None
 
-                            if not item_exists:
-                                raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (or_item_name, location["name"]))
-                    else:
-                        item_parts = item.split(":")
-                        item_name = item
+    @staticmethod
+    def getLookups() -> ValidationLookups:
+        """Returns the lookups for the current tables, building them if they haven't been yet (runGenerationDataValidation rebuilds them every run)."""
+        if DataValidation.lookups is None:
+            DataValidation.lookups = ValidationLookups(DataValidation.item_table, DataValidation.location_table, DataValidation.region_table)
 
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
+        return DataValidation.lookups
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+    @staticmethod
+    def checkItemNamesInLocationRequires():
+        for area_type, location_name, item_names in DataValidation.getLookups().requires.area_item_names:
+            if area_type != "location":
+                continue
 
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
+            for item_name in item_names:
+                if item_name not in DataValidation.getLookups().item_names:
+                    raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location_name))
 
     @staticmethod
     def checkItemNamesInRegionRequires():
-        for region_name in DataValidation.region_table:
-            region = DataValidation.region_table[region_name]
-
-            if "requires" not in region:
+        for area_type, region_name, item_names in DataValidation.getLookups().requires.area_item_names:
+            if area_type != "region":
                 continue
 
-            if isinstance(region["requires"], str):
-                # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', region["requires"]):
-                    if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
-                        continue
-                    else:
-                        # it's just a category, so ignore it
-                        if '@' in item:
-                            continue
-
-                        item = item.replace("|", "")
-
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
-
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
-
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
-
-            else:  # item access is in dict form
-                for item in region["requires"]:
-                    # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-                    if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                        or_items = item
-
-                        if isinstance(item, dict):
-                            or_items = item["or"]
-
-                        for or_item in or_items:
-                            or_item_parts = or_item.split(":")
-                            or_item_name = or_item
-
-                            if len(or_item_parts) > 1:
-                                or_item_name = or_item_parts[0]
-
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
-
-                            if not item_exists:
-                                raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (or_item_name, region_name))
-                    else:
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
-
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
-
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
+            for item_name in item_names:
+                if item_name not in DataValidation.getLookups().item_names:
+                    raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
 
     @staticmethod
     def checkRegionNamesInLocations():
@@ -145,13 +143,15 @@ class DataValidation():
             if "region" not in location or location["region"] in ["Menu", "Manual"]:
                 continue
 
-            region_exists = len([name for name in DataValidation.region_table if name == location["region"]]) > 0
+            region_exists = location["region"] in DataValidation.region_table
 
             if not region_exists:
                 raise ValidationError("Region %s is set for location %s, but the region is misspelled or does not exist." % (location["region"], location["name"]))
 
     @staticmethod
     def checkItemsThatShouldBeRequired():
+        item_references = DataValidation.getLookups().requires.item_references
+
         for item in DataValidation.item_table:
             # if the item is already progression, no need to check
             if "progression" in item and item["progression"]:
@@ -161,39 +161,10 @@ class DataValidation():
             if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
                 continue
 
-            # check location requires for the presence of item name
-            for location in DataValidation.location_table:
-                if "requires" not in location:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                location_requires = json.dumps(location["requires"])
-
-                # if boolean, else legacy
-                if isinstance(location_requires, str):
-                    if '|{}|'.format(item["name"]) in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
-                else:
-                    if item["name"] in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
-
-            # check region requires for the presence of item name
-            for region_name in DataValidation.region_table:
-                region = DataValidation.region_table[region_name]
-
-                if "requires" not in region:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                region_requires = json.dumps(region["requires"])
-
-                # if boolean, else legacy
-                if isinstance(region_requires, str):
-                    if '|{}|'.format(item["name"]) in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
-                else:
-                    if item["name"] in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
+            # locations are indexed before regions, so the first reference is a location if any location requires the item
+            if item["name"] in item_references:
+                area_type, area_name = item_references[item["name"]][0]
+                raise ValidationError("Item %s is required by %s %s, but the item is not marked as progression." % (item["name"], area_type, area_name))
 
     @staticmethod
     def _checkLocationRequiresForItemValueWithRegex(values_requested: dict[str, int], requires) -> dict[str, int]:
@@ -210,28 +181,9 @@ class DataValidation():
     @staticmethod
     def checkIfEnoughItemsForValue():
         values_available = {}
-        values_requested = {}
-
-        # First find the biggest values required by locations
-        for location in DataValidation.location_table:
-            if "requires" not in location:
-                continue
-
-            # convert to json so we don't have to guess the data type
-            location_requires = json.dumps(location["requires"])
-
-            DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, location_requires)
-        # Second, check region requires for the presence of item name
-        for region_name in DataValidation.region_table:
-            region = DataValidation.region_table[region_name]
-
-            if "requires" not in region:
-                continue
+        # First find the biggest values required by locations and regions
+        values_requested = DataValidation.getLookups().requires.getValueRequests()
 
-            # convert to json so we don't have to guess the data type
-            region_requires = json.dumps(region["requires"])
-
-            DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, region_requires)
         # then if something is requested, we loop items
         if values_requested:
 
@@ -262,22 +214,16 @@ class DataValidation():
     def preFillCheckIfEnoughItemsForValue(world: World, multiworld: MultiWorld):
         from .Helpers import get_items_with_value, get_items_for_player
         player = world.player
-        values_requested = {}
+        areas = []
 
         for region in multiworld.regions:
             if region.player != player:
                 continue
 
-            manualregion = DataValidation.region_table.get(region.name, {})
-            if "requires" in manualregion and manualregion["requires"]:
-                region_requires = json.dumps(manualregion["requires"])
+            areas.append(("region", region.name))
+            areas.extend(("location", location.name) for location in region.locations)
 
-                DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, region_requires)
-
-            for location in region.locations:
-                manualLocation = world.location_name_to_location.get(location.name, {})
-                if "requires" in manualLocation and manualLocation["requires"]:
-                    DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, manualLocation["requires"])
+        values_requested = DataValidation.getLookups().requires.getValueRequests(areas)
 
         # compare whats available vs requested but only if there's anything requested
         if values_requested:
@@ -306,7 +252,7 @@ class DataValidation():
                 continue
 
             for connecting_region in region["connects_to"]:
-                region_exists = len([name for name in DataValidation.region_table if name == connecting_region]) > 0
+                region_exists = connecting_region in DataValidation.region_table
 
                 if not region_exists:
                     raise ValidationError("Region %s connects to a region %s, which is misspelled or does not exist." % (region_name, connecting_region))
@@ -314,7 +260,7 @@ class DataValidation():
     @staticmethod
     def checkForDuplicateItemNames():
         for item in DataValidation.item_table:
-            name_count = len([i for i in DataValidation.item_table if i["name"] == item["name"]])
+            name_count = DataValidation.getLookups().item_name_counts[item["name"]]
 
             if name_count > 1:
                 raise ValidationError("Item %s is defined more than once." % (item["name"]))
@@ -322,7 +268,7 @@ class DataValidation():
     @staticmethod
     def checkForDuplicateLocationNames():
         for location in DataValidation.location_table:
-            name_count = len([l for l in DataValidation.location_table if l["name"] == location["name"]])
+            name_count = DataValidation.getLookups().location_name_counts[location["name"]]
 
             if name_count > 1:
                 raise ValidationError("Location %s is defined more than once." % (location["name"]))
@@ -330,8 +276,10 @@ class DataValidation():
     @staticmethod
     def checkForDuplicateRegionNames():
         # this currently does nothing because the region name is a dict key, which will never be non-unique / limited to 1
+        region_name_counts = Counter(DataValidation.region_table.keys())
+
         for region_name in DataValidation.region_table:
-            name_count = len([r for r in DataValidation.region_table if r == region_name])
+            name_count = region_name_counts[region_name]
 
             if name_count > 1:
                 raise ValidationError("Region %s is defined more than once." % (region_name))
@@ -349,12 +297,12 @@ class DataValidation():
 
             if "items" in starting_block:
                 for item_name in starting_block["items"]:
-                    if not item_name in [item["name"] for item in DataValidation.item_table]:
+                    if not item_name in DataValidation.getLookups().item_names:
                         raise ValidationError("Item %s is set as a starting item, but is misspelled or is not defined." % (item_name))
 
             if "item_categories" in starting_block:
                 for category_name in starting_block["item_categories"]:
-                    if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                    if not DataValidation.getLookups().category_to_item_names.get(category_name):
                         raise ValidationError("Item category %s is set as a starting item category, but is misspelled or is not defined on any items." % (category_name))
 
     @staticmethod
@@ -398,7 +346,7 @@ class DataValidation():
                 continue
 
             for item_name in place_item:
-                if not item_name in [item["name"] for item in DataValidation.item_table]:
+                if not item_name in DataValidation.getLookups().item_names:
                     raise ValidationError("Item %s is placed (using place_item) on a location, but is misspelled or is not defined." % (item_name))
 
     @staticmethod
@@ -412,7 +360,7 @@ class DataValidation():
                 continue
 
             for category_name in place_item_category:
-                if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                if not DataValidation.getLookups().category_to_item_names.get(category_name):
                     raise ValidationError("Item category %s is placed (using place_item_category) on a location, but is misspelled or is not defined." % (category_name))
 
     @staticmethod
@@ -438,11 +386,13 @@ class DataValidation():
             return
 
         nonstarting_regions = [region for region in DataValidation.region_table if "starting" in DataValidation.region_table[region] and not DataValidation.region_table[region]["starting"]]
+        connected_to_regions = set(
+            connecting_region for region in DataValidation.region_table.values() if "connects_to" in region
+                for connecting_region in region["connects_to"] or []
+        )
 
         for nonstarter in nonstarting_regions:
-            regions_that_connect_to = [region for region in DataValidation.region_table if "connects_to" in DataValidation.region_table[region] and nonstarter in DataValidation.region_table[region]["connects_to"]]
-
-            if len(regions_that_connect_to) == 0:
+            if nonstarter not in connected_to_regions:
                 raise ValidationError("The region '%s' is set as a non-starting region, but has no regions that connect to it. It will be inaccessible." % nonstarter)
 
 
@@ -456,10 +406,64 @@ def runPreFillDataValidation(world: World, multiworld: MultiWorld):
     if validation_errors:
         newline = "\n"
         raise Exception(f"\nValidationError(s) for pre_fill of player {world.player}: \n\n{newline.join([' - ' + str(validation_error) for validation_error in validation_errors])}\n\n")
+
+
+def getValidatorSource() -> str:
+    """Returns the source of this module (so, of every check), or "" if it can't be read, like when only the .pyc is shipped."""
+    try:
+        return inspect.getsource(sys.modules[__name__])
+    except (OSError, TypeError):
+        return ""
+
+def getValidationCacheKey() -> str:
+    """Returns a hash of everything the generation checks look at: the tables (after the hooks ran) and the starting items,
+    plus the checks themselves, so that results cached by older checks aren't trusted."""
+    contents = json.dumps({
+        "version": VALIDATION_CACHE_VERSION,
+        "validators": sha256(getValidatorSource().encode("utf-8")).hexdigest(),
+        "starting_items": DataValidation.game_table.get("starting_items", []),
+        "items": DataValidation.item_table,
+        "locations": DataValidation.location_table,
+        "regions": DataValidation.region_table,
+        "categories": DataValidation.category_table
+    }, sort_keys=True, default=str)
+
+    return sha256(contents.encode("utf-8")).hexdigest()
+
+def getValidationCachePath() -> str:
+    game = "Manual_%s_%s" % (DataValidation.game_table.get("game", ""), DataValidation.game_table.get("creator", ""))
+    return cache_path("manual_validation", f"{game}.json")
+
+def isValidationCached(key: str) -> bool:
+    try:
+        with open(getValidationCachePath(), encoding="utf-8") as cache_file:
+            return json.load(cache_file).get("key") == key
+    except (OSError, ValueError, AttributeError):
+        return False
+
+def storeValidationCache(key: str) -> None:
+    # the cache only saves time, so not being able to write it is never an error
+    try:
+        path = getValidationCachePath()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as cache_file:
+            json.dump({"key": key}, cache_file)
+    except OSError as e:
+        logging.debug(f"Could not write the data validation cache: {e}")
+
 # Called during stage_assert_generate
 def runGenerationDataValidation() -> None:
+    # the tables only change when the apworld does, so if these exact tables passed before, they still pass
+    #   (only passing results are cached, so errors are always shown)
+    cache_key = getValidationCacheKey()
+    if isValidationCached(cache_key):
+        return
+
     validation_errors = []
 
+    # build the name lookups that the checks share, once for this run
+    DataValidation.lookups = ValidationLookups(DataValidation.item_table, DataValidation.location_table, DataValidation.region_table)
+
     # check that requires have correct item names in locations and regions
     try: DataValidation.checkItemNamesInLocationRequires()
     except ValidationError as e: validation_errors.append(e)
@@ -517,3 +521,5 @@ def runGenerationDataValidation() -> None:
     except ValidationError as e: validation_errors.append(e)
     if len(validation_errors) > 0:
         raise Exception("\nValidationError(s): \n\n%s\n\n" % ("\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
+
+    storeValidationCache(cache_key)
@@ -1,4 +1,6 @@
-from BaseClasses import MultiWorld, Item
+from BaseClasses import MultiWorld, Item, Location
+from collections import deque
+from random import Random
 from typing import Optional, List
 from worlds.AutoWorld import World
 from .Data import category_table
@@ -27,8 +29,16 @@ def clamp(value, min, max):
     else:
         return value
 
+def get_enablement_table(multiworld: MultiWorld, player: int) -> Optional["EnablementTable"]:
+    """Return the player's EnablementTable, or None if it hasn't been made yet."""
+    return getattr(multiworld.worlds[player], "enablement", None)
+
 def is_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
     """Check if a category has been disabled by a yaml option."""
+    enablement = get_enablement_table(multiworld, player)
+    if enablement is not None and category_name in enablement.categories:
+        return enablement.categories[category_name]
+
     hook_result = before_is_category_enabled(multiworld, player, category_name)
     if hook_result is not None:
         return hook_result
@@ -58,6 +68,10 @@ def is_item_name_enabled(multiworld: MultiWorld, player: int, item_name: str) ->
 
 def is_item_enabled(multiworld: MultiWorld, player: int, item: ManualItem) -> bool:
     """Check if an item has been disabled by a yaml option."""
+    enablement = get_enablement_table(multiworld, player)
+    if enablement is not None and item.get("name") in enablement.items:
+        return enablement.items[item["name"]]
+
     hook_result = before_is_item_enabled(multiworld, player, item)
     if hook_result is not None:
         return hook_result
@@ -74,12 +88,22 @@ def is_location_name_enabled(multiworld: MultiWorld, player: int, location_name:
 
 def is_location_enabled(multiworld: MultiWorld, player: int, location: ManualLocation) -> bool:
     """Check if a location has been disabled by a yaml option."""
+    enablement = get_enablement_table(multiworld, player)
+    if enablement is not None and location.get("name") in enablement.locations:
+        return enablement.locations[location["name"]]
+
     hook_result = before_is_location_enabled(multiworld, player, location)
     if hook_result is not None:
         return hook_result
 
     return _is_manualobject_enabled(multiworld, player, location)
 
+def get_enabled_locations(multiworld: MultiWorld, player: int, locations: list[dict]) -> list[dict]:
+    """Return the locations from 'locations' that haven't been disabled by a yaml option.\n
+    create_regions builds the player's EnablementTable before calling this, so each check is a lookup in it.
+    """
+    return [location for location in locations if is_location_enabled(multiworld, player, location)]
+
 def _is_manualobject_enabled(multiworld: MultiWorld, player: int, object: any) -> bool:
     """Internal method: Check if a Manual Object has any category disabled by a yaml option.
     \nPlease use the proper is_'item/location'_enabled or is_'item/location'_name_enabled methods instead.
@@ -126,3 +150,188 @@ def get_items_with_value(world: World, multiworld: MultiWorld, value: str, playe
                             and i.name in world.item_name_groups.get(f'has_{value}_value', [])}
         world.item_values[player][value] = item_with_values
     return world.item_values[player].get(value)
+
+class EnablementTable:
+    """Whether each category, item and location is enabled for one player.\n
+    Options don't change after before_create_regions, so ManualWorld.create_regions makes this once right after that hook,
+    and the is_*_enabled functions look their answer up here instead of resolving the yaml options every time.
+    Anything that isn't in the tables (like an item made by a hook) is still checked the normal way.
+    """
+
+    def __init__(self, multiworld: MultiWorld, player: int):
+        world = multiworld.worlds[player]
+
+        category_names = set(category_table.keys())
+        for entry in [*world.item_name_to_item.values(), *world.location_name_to_location.values()]:
+            category_names.update(entry.get("category", []))
+
+        # the is_*_enabled functions only use these tables once they're on the world, so these calls all resolve normally
+        self.categories: dict[str, bool] = {
+            category_name: is_category_enabled(multiworld, player, category_name) for category_name in category_names
+        }
+        # items and locations only use the category table above, instead of resolving each of their categories again
+        self.items: dict[str, bool] = {
+            name: self._is_enabled(before_is_item_enabled(multiworld, player, item), item)
+                for name, item in world.item_name_to_item.items()
+        }
+        self.locations: dict[str, bool] = {
+            name: self._is_enabled(before_is_location_enabled(multiworld, player, location), location)
+                for name, location in world.location_name_to_location.items()
+        }
+
+    def _is_enabled(self, hook_result: Optional[bool], object: any) -> bool:
+        if hook_result is not None:
+            return hook_result
+
+        return all(self.categories[category] for category in object.get("category", []))
+
+class LockedPlacements:
+    """Places items as locked items and takes them out of multiworld.itempool in a single pass.\n
+    multiworld.itempool holds every player's items, so removing placed items one at a time gets slow with many players.
+    Use it as a context manager (the pool is updated when the block ends) or call remove_from_itempool() yourself.
+    """
+
+    def __init__(self, multiworld: MultiWorld):
+        self.multiworld = multiworld
+        self.placed_items: List[Item] = []
+        self._placed_ids: set[int] = set()
+        self._used_location_ids: set[int] = set()
+
+    def place(self, location: Location, item: Item):
+        location.place_locked_item(item)
+        self.placed_items.append(item)
+        self._placed_ids.add(id(item))
+        self._used_location_ids.add(id(location))
+
+    def is_placed(self, item: Item) -> bool:
+        return id(item) in self._placed_ids
+
+    def is_location_used(self, location: Location) -> bool:
+        return id(location) in self._used_location_ids
+
+    def place_randomly(self, random: Random, locations: List[Location], items: List[Item]):
+        """Place each item at a random one of 'locations', never using a location twice, until the items or locations run out.\n
+        Same as calling random.choice() on the locations and then removing the chosen one from the list for each item,
+        but the locations are filtered once (leaving out any this object already used) and each pick is O(log n).
+        """
+        locations = [location for location in locations if not self.is_location_used(location)]
+        remaining = _RankTree(len(locations))
+
+        for item in items:
+            if remaining.total == 0:
+                break
+
+            # random.choice() on a range uses the same random call as random.choice() on a list of the same length
+            slot = remaining.find(random.choice(range(remaining.total)))
+            remaining.remove(slot)
+            self.place(locations[slot], item)
+
+    def remove_from_itempool(self):
+        """Remove every item placed so far from multiworld.itempool, keeping the same list object."""
+        if self._placed_ids:
+            self.multiworld.itempool[:] = [item for item in self.multiworld.itempool if id(item) not in self._placed_ids]
+            self._placed_ids.clear()
+            self.placed_items.clear()
+            self._used_location_ids.clear()
+
+    def __enter__(self) -> "LockedPlacements":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.remove_from_itempool()
+
+class PoolSelection:
+    """Picks items out of an item pool by index instead of calling pool.remove() for every pick.\n
+    Picks are marked in a bitmap and the pool is only rebuilt once, by compact().\n
+    Like list.remove(), a pick always takes the earliest unpicked item that is equal to the chosen one,
+    so the results are the same as the remove()-based code for the same seed.
+    """
+
+    def __init__(self, pool: List[Item]):
+        self._index(pool)
+
+    def candidates(self, item_names: Optional[set[str]] = None) -> List[int]:
+        """Return the pool indexes of every unpicked item, in pool order, optionally limited to the given item names."""
+        return [index for index, item in enumerate(self.pool)
+                if not self.picked[index] and (item_names is None or item.name in item_names)]
+
+    def pick(self, index: int) -> int:
+        """Mark the earliest unpicked item equal to the item at 'index' as picked and return its pool index."""
+        item = self.pool[index]
+        index = self._positions[(item.name, item.player)].popleft()
+        self.picked[index] = 1
+        return index
+
+    def pick_shuffled(self, random: Random, item_names: Optional[set[str]] = None, count: Optional[int] = None) -> List[Item]:
+        """Same as shuffling the unpicked items (optionally limited to the given item names) and picking the first 'count' of them
+        (or all of them if count is None).\n
+        Without item names, the remove()-based code shuffled the pool itself, so this shuffles the unpicked items in place too,
+        which changes the order that later candidates() return them in.
+        """
+        if item_names is None:
+            pool = self.compact()
+            random.shuffle(pool)
+            # the positions index is built from the pool order, so it's built again after the shuffle
+            self._index(pool)
+            candidates = self.candidates()
+        else:
+            candidates = self.candidates(item_names)
+            random.shuffle(candidates)
+
+        if count is not None:
+            candidates = candidates[0:count]
+        return [self.pool[self.pick(index)] for index in candidates]
+
+    def pick_choices(self, random: Random, candidates: List[int], count: int) -> List[Item]:
+        """Same as calling random.choice() on the candidate items 'count' times, removing each choice before the next one."""
+        slots = {index: slot for slot, index in enumerate(candidates)}
+        remaining = _RankTree(len(candidates))
+        picks = []
+
+        for _ in range(count):
+            # random.choice() on a range uses the same random call as random.choice() on a list of the same length
+            chosen = candidates[remaining.find(random.choice(range(remaining.total)))]
+            index = self.pick(chosen)
+            remaining.remove(slots[index])
+            picks.append(self.pool[index])
+
+        return picks
+
+    def compact(self) -> List[Item]:
+        """Return the pool without the picked items."""
+        return [item for item, picked in zip(self.pool, self.picked) if not picked]
+
+    def _index(self, pool: List[Item]):
+        self.pool = pool
+        self.picked = bytearray(len(pool))
+        self._positions: dict[tuple[str, int], deque[int]] = {}
+
+        for index, item in enumerate(pool):
+            self._positions.setdefault((item.name, item.player), deque()).append(index)
+
+class _RankTree:
+    """Internal class: Fenwick tree over a row of slots that can find the Nth remaining slot and remove slots in O(log n)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.total = size
+        # every slot starts with a count of 1, so each node holds the size of the range it covers
+        self.tree = [0] + [index & -index for index in range(1, size + 1)]
+
+    def remove(self, slot: int):
+        self.total -= 1
+        slot += 1
+        while slot <= self.size:
+            self.tree[slot] -= 1
+            slot += slot & -slot
+
+    def find(self, rank: int) -> int:
+        """Return the slot of the remaining slot at 0-based position 'rank'."""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            if position + step <= self.size and self.tree[position + step] <= rank:
+                position += step
+                rank -= self.tree[position]
+            step >>= 1
+        return position
@@ -10,6 +10,7 @@ from .Game import filler_item_name, starting_index
 item_id_to_name: dict[int, str] = {}
 item_name_to_item: dict[str, dict] = {}
 item_name_groups: dict[str, str] = {}
+item_category_to_names: dict[str, set[str]] = {}
 advancement_item_names: set[str] = set()
 lastItemId = -1
 
@@ -47,6 +48,10 @@ for item in item_table:
             item_name_groups[c] = []
         item_name_groups[c].append(item_name)
 
+        if c not in item_category_to_names:
+            item_category_to_names[c] = set()
+        item_category_to_names[c].add(item_name)
+
     for v in item.get("value", {}).keys():
         group_name = f"has_{v.lower().strip()}_value"
         if group_name not in item_name_groups:
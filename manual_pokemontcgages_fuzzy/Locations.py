@@ -43,10 +43,12 @@ if not victory_names:
 location_id_to_name: dict[int, str] = {}
 location_name_to_location: dict[str, dict] = {}
 location_name_groups: dict[str, list[str]] = {}
+region_to_locations: dict[str, list[dict]] = {} # the locations of each region, in location table order
 
 for item in location_table:
     location_id_to_name[item["id"]] = item["name"]
     location_name_to_location[item["name"]] = item
+    region_to_locations.setdefault(item["region"], []).append(item)
 
     for c in item.get("category", []):
         if c not in location_name_groups:
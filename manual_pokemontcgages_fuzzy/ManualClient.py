@@ -16,6 +16,7 @@ if __name__ == "__main__":
     Utils.init_logging("ManualClient", exception_logger="Client")
 
 from NetUtils import ClientStatus
+from .Tracker import TrackerModel, TrackerChanges, VICTORY_KEY
 from CommonClient import gui_enabled, logger, get_base_parser, ClientCommandProcessor, server_loop
 from MultiServer import mark_raw
 
@@ -52,6 +53,20 @@ class ManualClientCommandProcessor(ClientCommandProcessor):
 
 
 
+class WatcherFlag:
+    """A ManualContext flag for game_watcher_manual to act on. Setting it to True wakes the watcher up."""
+    def __set_name__(self, owner, name):
+        self.attribute_name = "_" + name
+
+    def __get__(self, ctx, owner=None):
+        if ctx is None:
+            return self
+        return getattr(ctx, self.attribute_name, False)
+
+    def __set__(self, ctx, value):
+        setattr(ctx, self.attribute_name, value)
+        if value:
+            ctx.watcher_event.set()
 
 
 class ManualContext(SuperContext):
@@ -68,9 +83,11 @@ class ManualContext(SuperContext):
     tracker_reachable_locations = []
     tracker_reachable_events = []
 
-    set_deathlink = False
+    # these wake up game_watcher_manual when they're set, so it has something to send
+    syncing = WatcherFlag()
+    set_deathlink = WatcherFlag()
+    deathlink_out = WatcherFlag()
     last_death_link = 0
-    deathlink_out = False
 
     colors = {
         'location_default': [219/255, 218/255, 213/255, 1],
@@ -78,6 +95,7 @@ class ManualContext(SuperContext):
         'category_even_default': [0.5, 0.5, 0.5, 0.1],
         'category_odd_default': [1.0, 1.0, 1.0, 0.0],
         'category_in_logic': [2/255, 82/255, 2/255, 1],
+        'category_default': [0.35, 0.35, 0.35, 1],
         'deathlink_received': [1, 0, 0, 1],
         'deathlink_primed': [1, 1, 1, 1],
         'deathlink_sent': [0, 1, 0, 1]
@@ -92,7 +110,17 @@ class ManualContext(SuperContext):
                 super().set_events_callback(self.on_tracker_events) # Universal Tracker takes this func and calls it when events are calculated
 
         self.send_index: int = 0
+        # set whenever there's something for game_watcher_manual to send
+        self.watcher_event = asyncio.Event()
+        self.locations_checked = []
         self.syncing = False
+        # what the tracker panels show, kept apart from Kivy (see Tracker.py)
+        self.tracker_model = TrackerModel(self.get_item_by_id, self.get_location_by_id, self.is_category_hidden,
+                                          lambda location_name: self.location_names_to_id.get(location_name))
+        # tracker changes waiting to be drawn on the next frame (see queue_tracker_refresh)
+        self.pending_tracker_changes = TrackerChanges()
+        self.pending_tracker_highlights = False
+        self.ui_refresh_scheduled = False
         self.game = game
         self.username = player_name
 
@@ -154,6 +182,10 @@ class ManualContext(SuperContext):
         name = self.item_names.lookup_in_game(id)
         return self.get_item_by_name(name)
 
+    def is_category_hidden(self, category: str) -> bool:
+        category_settings = self.category_table.get(category) or getattr(AutoWorldRegister.world_types[self.game], "category_table", {}).get(category, {})
+        return bool(category_settings.get("hidden"))
+
     def update_ids(self, data_package) -> None:
         self.location_names_to_id = data_package['location_name_to_id']
         self.item_names_to_id = data_package['item_name_to_id']
@@ -176,6 +208,7 @@ class ManualContext(SuperContext):
 
     def on_package(self, cmd: str, args: dict):
         super().on_package(cmd, args)
+        tracker_changes = self.tracker_model.on_package(cmd, args)
 
         if cmd in {"Connected", "DataPackage"}:
             if cmd == "Connected":
@@ -189,12 +222,36 @@ class ManualContext(SuperContext):
                     self.last_death_link = 0
                 logger.info(f"Slot data: {args['slot_data']}")
 
-            self.ui.build_tracker_and_locations_table()
-            self.ui.update_tracker_and_locations_table(update_highlights=True)
+            self.queue_tracker_refresh(TrackerChanges(rebuilt=True), update_highlights=True)
         elif cmd in {"ReceivedItems"}:
-            self.ui.update_tracker_and_locations_table(update_highlights=True)
+            self.queue_tracker_refresh(tracker_changes, update_highlights=True)
         elif cmd in {"RoomUpdate"}:
-            self.ui.update_tracker_and_locations_table(update_highlights=False)
+            self.queue_tracker_refresh(tracker_changes, update_highlights=False)
+
+    def queue_tracker_refresh(self, changes: TrackerChanges, update_highlights: bool = False):
+        """Adds the changes to the ones waiting to be drawn. A burst of packets (like a release) is then drawn once, on the next frame."""
+        self.pending_tracker_changes.merge(changes)
+        self.pending_tracker_highlights = self.pending_tracker_highlights or update_highlights
+        self.schedule_ui_refresh()
+
+    def schedule_ui_refresh(self):
+        """Calls refresh_ui on the next Kivy frame, unless it's already going to be."""
+        if self.ui is None or self.ui_refresh_scheduled:
+            return
+
+        from kivy.clock import Clock
+        self.ui_refresh_scheduled = True
+        Clock.schedule_once(lambda dt: self.refresh_ui(), 0)
+
+    def refresh_ui(self):
+        """Draws everything that was queued since the last frame. Extend this to refresh your own tabs once per frame too."""
+        self.ui_refresh_scheduled = False
+
+        changes, self.pending_tracker_changes = self.pending_tracker_changes, TrackerChanges()
+        update_highlights, self.pending_tracker_highlights = self.pending_tracker_highlights, False
+
+        if changes:
+            self.ui.render_tracker_changes(changes, update_highlights)
 
     def on_deathlink(self, data: typing.Dict[str, typing.Any]) -> None:
         super().on_deathlink(data)
@@ -204,12 +261,12 @@ class ManualContext(SuperContext):
 
     def on_tracker_updated(self, reachable_locations: list[str]):
         self.tracker_reachable_locations = reachable_locations
-        self.ui.update_tracker_and_locations_table(update_highlights=True)
+        self.queue_tracker_refresh(self.tracker_model.set_reachable(locations=reachable_locations), update_highlights=True)
 
     def on_tracker_events(self, events: list[str]):
         self.tracker_reachable_events = events
         if events:
-            self.ui.update_tracker_and_locations_table(update_highlights=True)
+            self.queue_tracker_refresh(self.tracker_model.set_reachable(events=events), update_highlights=True)
 
     def run_gui(self):
         """Import kivy UI system and start running it as self.ui_task."""
@@ -221,28 +278,77 @@ class ManualContext(SuperContext):
         from kivy.uix.layout import Layout
         from kivy.uix.boxlayout import BoxLayout
         from kivy.uix.gridlayout import GridLayout
-        from kivy.uix.scrollview import ScrollView
         from kivy.uix.textinput import TextInput
         from kivy.uix.tabbedpanel import TabbedPanelItem
-        from kivy.uix.treeview import TreeView, TreeViewNode, TreeViewLabel
+        from kivy.uix.recycleview import RecycleView
+        from kivy.uix.recycleview.views import RecycleDataViewBehavior
+        from kivy.uix.recycleboxlayout import RecycleBoxLayout
+        from kivy.properties import StringProperty, NumericProperty, BooleanProperty, ObjectProperty
         from kivy.clock import Clock
-        from kivy.core.window import Window
 
         class TrackerAndLocationsLayout(GridLayout):
             pass
 
-        class TrackerLayoutScrollable(ScrollView):
-            pass
-
-        class LocationsLayoutScrollable(ScrollView):
-            pass
-
-        class TreeViewButton(Button, TreeViewNode):
-            victory: bool = False
-            id: int = None
-
-        class TreeViewScrollView(ScrollView, TreeViewNode):
-            pass
+        class TrackerRow(RecycleDataViewBehavior, Button):
+            """One row of a TrackerPanel. What kind of row it is (title, category, item or location) comes from its data."""
+            row_type = StringProperty("")
+            category = StringProperty("")
+            location_id = NumericProperty(0)
+            victory = BooleanProperty(False)
+            panel = ObjectProperty(None, allownone=True)
+
+            def on_release(self):
+                if self.panel is not None:
+                    self.panel.row_clicked(self)
+
+        class TrackerPanel(RecycleView):
+            """A list of categories that expand into their rows when clicked.\n
+            Rows are plain dicts, and RecycleView only makes TrackerRow widgets for the rows that are on screen,
+            so thousands of locations don't mean thousands of widgets.
+            """
+            def __init__(self, on_row_click, **kwargs):
+                super().__init__(do_scroll_x=False, bar_width=10, **kwargs)
+                self.viewclass = TrackerRow
+                rows_layout = RecycleBoxLayout(orientation="vertical", default_size=(None, dp(30)), default_size_hint=(1, None), size_hint_y=None)
+                rows_layout.bind(minimum_height=rows_layout.setter("height"))
+                self.add_widget(rows_layout)
+
+                self.on_row_click = on_row_click
+                self.title = self.make_row("", "title")
+                # category -> its header row
+                self.headers: dict[str, dict] = {}
+                # category -> key (item id, location id, ...) -> the row listed under that category
+                self.rows: dict[str, dict] = {}
+                self.expanded: set[str] = set()
+
+            def make_row(self, text: str, row_type: str, **values) -> dict:
+                # every row sets every property, since RecycleView reuses the same widgets for different rows
+                row = {"text": text, "row_type": row_type, "category": "", "location_id": 0, "victory": False,
+                       "bold": False, "background_color": [1, 1, 1, 1], "panel": self}
+                row.update(values)
+                return row
+
+            def add_category(self, category: str, **values):
+                self.headers[category] = self.make_row(category, "category", category=category, **values)
+                self.rows[category] = {}
+
+            def refresh(self):
+                """Shows the current rows. Only the rows of expanded categories are listed."""
+                data = [self.title]
+
+                for category in sorted(self.headers.keys()):
+                    data.append(self.headers[category])
+                    if category in self.expanded:
+                        data.extend(self.rows[category].values())
+
+                self.data = data
+
+            def row_clicked(self, row: TrackerRow):
+                if row.row_type == "category":
+                    self.expanded ^= {row.category}
+                    self.refresh()
+                elif row.row_type != "title":
+                    self.on_row_click(row)
 
         class ManualManager(GameManager):
             logging_pairs = [
@@ -250,14 +356,15 @@ class ManualContext(SuperContext):
                 ("Manual", "Manual"),
             ]
             base_title = "Archipelago Manual Client"
-            listed_items = {"(No Category)": []}
-            item_categories = ["(No Category)"]
-            listed_locations = {"(No Category)": []}
-            location_categories = ["(No Category)"]
-
             active_item_accordion = 0
             active_location_accordion = 0
 
+            # the items and locations panels, made by build_tracker_and_locations_table
+            items_panel = None
+            locations_panel = None
+            # rows made bold by the last highlighted update, to un-bold on the next one
+            bold_rows = []
+
             ctx: ManualContext
 
             def __init__(self, ctx):
@@ -289,12 +396,6 @@ class ManualContext(SuperContext):
 
                 return self.container
 
-            def clear_lists(self):
-                self.listed_items = {"(No Category)": []}
-                self.item_categories = ["(No Category)"]
-                self.listed_locations = {"(No Category)": [], "(Hinted)": []}
-                self.location_categories = ["(No Category)", "(Hinted)"]
-
             def set_active_item_accordion(self, instance):
                 index = 0
 
@@ -334,315 +435,144 @@ class ManualContext(SuperContext):
 
             def update_hints(self):
                 super().update_hints()
-                rebuild = False
-                for hint in self.ctx.stored_data.get(f"_read_hints_{self.ctx.team}_{self.ctx.slot}", []):
-                    if hint["finding_player"] == self.ctx.slot:
-                        if hint["location"] in self.ctx.missing_locations:
-                            location = self.ctx.get_location_by_id(hint["location"])
-                            location["category"] = location.get("category", [])
-                            if "(Hinted)" not in location["category"]:
-                                location["category"].append("(Hinted)")
-                                rebuild = True
-
-                if rebuild:
-                    self.build_tracker_and_locations_table()
-                self.update_tracker_and_locations_table()
+                hinted_locations = [
+                    hint["location"] for hint in self.ctx.stored_data.get(f"_read_hints_{self.ctx.team}_{self.ctx.slot}", [])
+                        if hint["finding_player"] == self.ctx.slot
+                ]
+                self.ctx.queue_tracker_refresh(self.ctx.tracker_model.add_hinted_locations(hinted_locations))
 
             def build_tracker_and_locations_table(self):
                 self.tracker_and_locations_panel.clear_widgets()
+                self.items_panel = None
+                self.locations_panel = None
+                self.bold_rows = []
 
                 if not self.ctx.server or not self.ctx.auth:
                     self.tracker_and_locations_panel.add_widget(
                                 Label(text="Waiting for connection...", size_hint_y=None, height=50, outline_width=1))
                     return
 
-                self.clear_lists()
-
-                # seed all category names to start
-                for item in self.ctx.item_table.values() or AutoWorldRegister.world_types[self.ctx.game].item_name_to_item.values():
-                    if "category" in item and len(item["category"]) > 0:
-                        for category in item["category"]:
-                            category_settings = self.ctx.category_table.get(category) or getattr(AutoWorldRegister.world_types[self.ctx.game], "category_table", {}).get(category, {})
-                            if "hidden" in category_settings and category_settings["hidden"]:
-                                continue
-                            if category not in self.item_categories:
-                                self.item_categories.append(category)
-
-                            if category not in self.listed_items:
-                                self.listed_items[category] = []
-
-
-                # Items are not received on connect, so don't bother attempting to work with received items here
-
                 if not self.ctx.location_table and not hasattr(AutoWorldRegister.world_types[self.ctx.game], 'location_name_to_location'):
                     raise Exception("The apworld for %s is too outdated for this client. Please update it." % (self.ctx.game))
 
-                for location_id in self.ctx.missing_locations:
-                    # holy nesting, wow
-                    location_name = self.ctx.location_names.lookup_in_game(location_id)
-                    location = self.ctx.get_location_by_name(location_name)
-
-                    if not location:
-                        continue
-
-                    if "category" in location and len(location["category"]) > 0:
-                        for category in location["category"]:
-                            category_settings = self.ctx.category_table.get(category) or getattr(AutoWorldRegister.world_types[self.ctx.game], "category_table", {}).get(category, {})
-                            if "hidden" in category_settings and category_settings["hidden"]:
-                                continue
-                            if category not in self.location_categories:
-                                self.location_categories.append(category)
-
-                            if category not in self.listed_locations:
-                                self.listed_locations[category] = []
-
-                            self.listed_locations[category].append(location_id)
-                    else: # leave it in the generic category
-                        self.listed_locations["(No Category)"].append(location_id)
-
-                victory_location =  self.ctx.goal_location
-                victory_categories = set()
-
-                if "category" in victory_location and len(victory_location["category"]) > 0:
-                    for category in victory_location["category"]:
-                        if category not in self.location_categories:
-                            self.location_categories.append(category)
-
-                        if category not in self.listed_locations:
-                            self.listed_locations[category] = []
-                            victory_categories.add(category)
-
-                if not victory_categories:
-                    victory_categories.add("(No Category)")
-
-                items_length = len(self.ctx.items_received)
-                tracker_panel_scrollable = TrackerLayoutScrollable(do_scroll=(False, True), bar_width=10)
-                tracker_panel = TreeView(root_options=dict(text="Items Received (%d)" % (items_length)), size_hint_y=None)
-                tracker_panel.bind(minimum_height=tracker_panel.setter('height'))
-
-                # Since items_received is not available on connect, don't bother building item labels here
-                for item_category in sorted(self.listed_items.keys()):
-                    category_tree = tracker_panel.add_node(
-                        TreeViewLabel(text = "%s (%s)" % (item_category, len(self.listed_items[item_category])))
-                    )
-
-                    category_scroll = tracker_panel.add_node(TreeViewScrollView(size_hint=(1, None), size=(Window.width / 2, 250)), category_tree)
-                    category_layout = GridLayout(cols=1, size_hint_y=None)
-                    category_layout.bind(minimum_height = category_layout.setter('height'))
-                    category_scroll.add_widget(category_layout)
-
-                locations_length = len(self.ctx.missing_locations)
-                locations_panel_scrollable = LocationsLayoutScrollable(do_scroll=(False, True), bar_width=10)
-                locations_panel = TreeView(root_options=dict(text="Remaining Locations (%d)" % (locations_length + 1)), size_hint_y=None)
-                locations_panel.bind(minimum_height=locations_panel.setter('height'))
-
-                # This seems like a redundant copy of the same check above?
-                if not self.ctx.location_table and not hasattr(AutoWorldRegister.world_types[self.ctx.game], 'location_name_to_location'):
-                    raise Exception("The apworld for %s is too outdated for this client. Please update it." % (self.ctx.game))
-
-                for location_category in sorted(self.listed_locations.keys()):
-                    locations_in_category = len(self.listed_locations[location_category])
-
-                    if ("category" in victory_location and location_category in victory_location["category"]) or \
-                        ("category" not in victory_location and location_category == "(No Category)"):
-                        locations_in_category += 1
-
-                    category_tree = locations_panel.add_node(
-                        TreeViewLabel(text = "%s (%s)" % (location_category, locations_in_category))
-                    )
-
-                    category_scroll = locations_panel.add_node(TreeViewScrollView(size_hint=(1, None), size=(Window.width / 2, 250)), category_tree)
-                    category_layout = GridLayout(cols=1, size_hint_y=None)
-                    category_layout.bind(minimum_height = category_layout.setter('height'))
-                    category_scroll.add_widget(category_layout)
-
-                    for location_id in self.listed_locations[location_category]:
-                        location_button = TreeViewButton(text=self.ctx.location_names.lookup_in_game(location_id), size_hint=(None, None), height=30, width=400)
-                        location_button.bind(on_release=lambda *args, loc_id=location_id: self.location_button_callback(loc_id, *args))
-                        location_button.id = location_id
-                        category_layout.add_widget(location_button)
-
-                    # if this is the category that Victory is in, display the Victory button
-                    # if ("category" in victory_location_data and location_category in victory_location_data["category"]) or \
-                    #     ("category" not in victory_location_data and location_category == "(No Category)"):
-                    if location_category in victory_categories:
-                        # Add the Victory location to be marked at any point, which is why locations length has 1 added to it above
-                        victory_text = "VICTORY! (seed finished)" if victory_location["name"] == "__Manual Game Complete__" else "GOAL: " + victory_location["name"]
-                        location_button = TreeViewButton(text=victory_text, size_hint=(None, None), height=30, width=400)
-                        location_button.victory = True
-                        location_button.bind(on_release=self.victory_button_callback)
-                        category_layout.add_widget(location_button)
-
-                tracker_panel_scrollable.add_widget(tracker_panel)
-                locations_panel_scrollable.add_widget(locations_panel)
-                self.tracker_and_locations_panel.add_widget(tracker_panel_scrollable)
-                self.tracker_and_locations_panel.add_widget(locations_panel_scrollable)
-
-            def update_tracker_and_locations_table(self, update_highlights=False):
-                items_length = len(self.ctx.items_received)
-                locations_length = len(self.ctx.missing_locations)
-
-                for _, child in enumerate(self.tracker_and_locations_panel.children):
-                    #
-                    # Structure of items:
-                    # TrackerLayoutScrollable -> TreeView -> TreeViewLabel, TreeViewScrollView -> GridLayout -> Label
-                    #        item tracker     -> category -> category label, category scroll   -> label col  -> item
-                    #
-                    if type(child) is TrackerLayoutScrollable:
-                        treeview = child.children[0] # TreeView
-                        treeview_nodes = treeview.iterate_all_nodes()
-
-                        items_received_label = next(treeview_nodes) # always the first node
-                        items_received_label.text = "Items Received (%s)" % (items_length)
-
-                        # loop for each category in listed items and get the label + scrollview
-                        for x in range(0, len(self.item_categories)):
-                            category_label = next(treeview_nodes) # TreeViewLabel for category
-                            category_scrollview = next(treeview_nodes) # TreeViewScrollView for housing category's grid layout
-
-                            old_category_text = category_label.text
-
-                            if type(category_label) is TreeViewLabel and type(category_scrollview) is TreeViewScrollView:
-                                category_grid = category_scrollview.children[0] # GridLayout
-
-                                category_name = re.sub(r"\s\(\d+\)$", "", category_label.text)
-                                category_count = 0
-                                category_unique_name_count = 0
-
-                                # Label (for existing item listings)
-                                for item in category_grid.children:
-                                     if type(item) is Label:
-                                        # Get the item name from the item Label, minus quantity, then do a lookup for count
-                                        old_item_text = item.text
-                                        item_name = re.sub(r"\s\(\d+\)$", "", item.text)
-                                        item_id = self.ctx.item_names_to_id[item_name]
-                                        item_count = len(list(i for i in self.ctx.items_received if i.item == item_id))
-
-                                        # Update the label quantity
-                                        item.text="%s (%s)" % (item_name, item_count)
+                model = self.ctx.tracker_model
+                model.build(self.ctx.item_table.values() or AutoWorldRegister.world_types[self.ctx.game].item_name_to_item.values(),
+                            self.ctx.goal_location)
 
-                                        if update_highlights:
-                                            item.bold = True if old_item_text != item.text else False
+                self.items_panel = TrackerPanel(lambda row: None)
+                for item_category in model.item_categories.keys():
+                    self.items_panel.add_category(item_category, background_color=self.ctx.colors['category_default'])
 
-                                        if item_count > 0:
-                                            category_count += item_count
-                                            category_unique_name_count += 1
+                self.locations_panel = TrackerPanel(self.location_row_callback)
+                for location_category in model.location_categories.keys():
+                    self.locations_panel.add_category(location_category, background_color=self.ctx.colors['category_default'])
 
-                                # Label (for new item listings)
-                                for network_item in self.ctx.items_received:
-                                    item_name = self.ctx.item_names.lookup_in_game(network_item.item)
-                                    item_data = self.ctx.get_item_by_name(item_name)
+                self.tracker_and_locations_panel.add_widget(self.items_panel)
+                self.tracker_and_locations_panel.add_widget(self.locations_panel)
 
-                                    if "category" not in item_data or not item_data["category"]:
-                                        item_data["category"] = ["(No Category)"]
-
-                                    if category_name in item_data["category"] and network_item.item not in self.listed_items[category_name]:
-                                        item_count = len(list(i for i in self.ctx.items_received if i.item == network_item.item))
-                                        item_text = Label(text="%s (%s)" % (item_name, item_count),
-                                                    size_hint=(None, None), height=30, width=400, bold=True)
+            def update_tracker_and_locations_table(self, update_highlights=False):
+                """Redraws everything in the panels from the tracker model."""
+                model = self.ctx.tracker_model
+                changes = TrackerChanges()
+                changes.item_ids.update(model.received_item_counts.keys())
+                changes.item_categories.update(model.item_categories.keys())
+                changes.location_categories.update(model.location_categories.keys())
+                changes.added_locations.update(model.location_id_categories.keys())
+
+                self.render_tracker_changes(changes, update_highlights)
+
+            def render_tracker_changes(self, changes: TrackerChanges, update_highlights=False):
+                """Redraws only the parts of the panels that a tracker model update changed."""
+                if changes.rebuilt:
+                    self.build_tracker_and_locations_table()
+                    self.update_tracker_and_locations_table(update_highlights)
+                    return
 
-                                        category_grid.add_widget(item_text)
-                                        self.listed_items[category_name].append(network_item.item)
+                if self.items_panel is None or self.locations_panel is None:
+                    return
 
-                                        category_count += item_count
-                                        category_unique_name_count += 1
+                model = self.ctx.tracker_model
 
-                            scrollview_height = 30 * category_unique_name_count
+                if update_highlights:
+                    for row in self.bold_rows:
+                        row["bold"] = False
+                    self.bold_rows = []
 
-                            if scrollview_height > 250:
-                                scrollview_height = 250
+                self.items_panel.title["text"] = "Items Received (%s)" % (model.received_items_count)
 
-                            if scrollview_height < 10:
-                                scrollview_height = 50
+                for item_id in changes.item_ids:
+                    item_text = "%s (%s)" % (self.ctx.item_names.lookup_in_game(item_id), model.received_item_counts[item_id])
 
-                            category_name = re.sub(r"\s\(\d+\)$", "", category_label.text)
-                            category_label.text = "%s (%s)" % (category_name, category_count)
+                    for category_name in model.get_item_categories(item_id):
+                        item_row = self.items_panel.rows[category_name].get(item_id)
 
+                        if item_row is None:
+                            # new rows are always highlighted
+                            item_row = self.items_panel.make_row(item_text, "item", category=category_name, bold=True)
+                            self.items_panel.rows[category_name][item_id] = item_row
+                            self.bold_rows.append(item_row)
+                        elif item_row["text"] != item_text:
+                            item_row["text"] = item_text
                             if update_highlights:
-                                category_label.bold = True if old_category_text != category_label.text else False
-
-                            category_scrollview.size=(Window.width / 2, scrollview_height)
-
-                    #
-                    # Structure of locations:
-                    # LocationsLayoutScrollable -> TreeView -> TreeViewLabel, TreeViewScrollView -> GridLayout -> Button
-                    #      location tracker     -> category -> category label, category scroll   -> label col  -> location
-                    #
-                    if type(child) is LocationsLayoutScrollable:
-                        treeview = child.children[0] # TreeView
-                        treeview_nodes = treeview.iterate_all_nodes()
-
-                        locations_remaining_label = next(treeview_nodes) # always the first node
-                        locations_remaining_label.text = "Remaining Locations (%d)" % (locations_length)
-
-                        # loop for each category in listed items and get the label + scrollview
-                        for x in range(0, len(self.location_categories)):
-                            category_label = next(treeview_nodes) # TreeViewLabel for category
-                            category_scrollview = next(treeview_nodes) # TreeViewScrollView for housing category's grid layout
-
-                            if type(category_label) is TreeViewLabel and type(category_scrollview) is TreeViewScrollView:
-                                category_grid = category_scrollview.children[0] # GridLayout
-
-                                category_name = re.sub(r"\s\(\d+\/?(\d+)?\)$", "", category_label.text)
-                                category_count = 0
-                                reachable_count = 0
-
-                                buttons_to_remove = []
-
-                                # Label (for existing item listings)
-                                for location_button in category_grid.children:
-                                    if type(location_button) is TreeViewButton:
-                                        # should only be true for the victory location button, which has different text
-                                        if location_button.text not in (self.ctx.location_table or AutoWorldRegister.world_types[self.ctx.game].location_name_to_location):
-                                            category_count += 1
-                                            if location_button.victory and "__Victory__" in self.ctx.tracker_reachable_events:
-                                                location_button.background_color = self.ctx.colors['location_in_logic']
-                                                reachable_count += 1
-                                            continue
-
-                                        if location_button.id and location_button.id not in self.ctx.missing_locations:
-                                            import logging
-
-                                            logging.info("location button being removed: " + location_button.text)
-                                            buttons_to_remove.append(location_button)
-                                            continue
-
-                                        if location_button.text in self.ctx.tracker_reachable_locations:
-                                            location_button.background_color = self.ctx.colors['location_in_logic']
-                                            reachable_count += 1
-                                        else:
-                                            location_button.background_color = self.ctx.colors['location_default']
-
-                                        category_count += 1
-
-                                for location_button in buttons_to_remove:
-                                    location_button.parent.remove_widget(location_button)
-
-                                scrollview_height = 30 * category_count
-
-                                if scrollview_height > 250:
-                                    scrollview_height = 250
-
-                                if scrollview_height < 10:
-                                    scrollview_height = 50
-
-                                count_text = category_count
-
-                                if tracker_loaded:
-                                    count_text = "{}/{}".format(reachable_count, category_count)
-
-                                category_name = re.sub(r"\s\(\d+\/?(\d+)?\)$", "", category_label.text)
-                                category_label.text = "%s (%s)" % (category_name, count_text)
-
-                                if reachable_count > 0:
-                                    # treeviewlabels don't have background color. because #justkivythings.
-                                    category_label.even_color = self.ctx.colors['category_in_logic']
-                                    category_label.odd_color = self.ctx.colors['category_in_logic']
-                                else:
-                                    category_label.even_color = self.ctx.colors['category_even_default']
-                                    category_label.odd_color = self.ctx.colors['category_odd_default']
-
-                                category_scrollview.size=(Window.width / 2, scrollview_height)
+                                item_row["bold"] = True
+                                self.bold_rows.append(item_row)
+
+                for category_name in changes.item_categories:
+                    category_row = self.items_panel.headers[category_name]
+                    category_text = "%s (%s)" % (category_name, model.get_item_category_count(category_name))
+
+                    if update_highlights and category_row["text"] != category_text:
+                        category_row["bold"] = True
+                        self.bold_rows.append(category_row)
+                    category_row["text"] = category_text
+
+                self.locations_panel.title["text"] = "Remaining Locations (%d)" % (len(model.missing_locations))
+
+                # checked locations are already gone from the model, so look for their rows in the categories that changed
+                for category_name in changes.location_categories:
+                    location_rows = self.locations_panel.rows[category_name]
+                    for location_id in changes.removed_locations:
+                        location_rows.pop(location_id, None)
+
+                # only new rows and rows that went in or out of logic get (re)coloured
+                for location_id in changes.added_locations | changes.flipped_locations:
+                    location_color = self.ctx.colors['location_in_logic' if model.is_location_reachable(location_id) else 'location_default']
+
+                    for category_name in model.get_location_categories(location_id):
+                        location_rows = self.locations_panel.rows[category_name]
+                        if location_id not in location_rows:
+                            location_rows[location_id] = self.make_location_row(location_id, category_name)
+                        location_rows[location_id]["background_color"] = location_color
+
+                for category_name in changes.location_categories:
+                    reachable_count, category_count = model.get_location_category_counts(category_name)
+                    count_text = category_count
+
+                    if tracker_loaded:
+                        count_text = "{}/{}".format(reachable_count, category_count)
+
+                    category_row = self.locations_panel.headers[category_name]
+                    category_row["text"] = "%s (%s)" % (category_name, count_text)
+                    category_row["background_color"] = self.ctx.colors['category_in_logic' if reachable_count > 0 else 'category_default']
+
+                self.items_panel.refresh()
+                self.locations_panel.refresh()
+
+            def make_location_row(self, location_id, category_name: str) -> dict:
+                if location_id == VICTORY_KEY:
+                    # the Victory location can be marked at any point, so it's always listed
+                    victory_location = self.ctx.tracker_model.victory_location
+                    victory_text = "VICTORY! (seed finished)" if victory_location["name"] == "__Manual Game Complete__" else "GOAL: " + victory_location["name"]
+                    return self.locations_panel.make_row(victory_text, "location", category=category_name, victory=True)
+
+                return self.locations_panel.make_row(self.ctx.location_names.lookup_in_game(location_id), "location",
+                                                     category=category_name, location_id=location_id)
+
+            def location_row_callback(self, row):
+                if row.victory:
+                    self.victory_button_callback(row)
+                else:
+                    self.location_button_callback(row.location_id, row)
 
             def location_button_callback(self, location_id, button):
                 if button.text not in self.ctx.location_names_to_id:
@@ -651,10 +581,7 @@ class ManualContext(SuperContext):
                 if location_id:
                     self.ctx.locations_checked.append(location_id)
                     self.ctx.syncing = True
-                    button.parent.remove_widget(button)
-
-                    # message = [{"cmd": 'LocationChecks', "locations": [location_id]}]
-                    # self.ctx.send_msgs(message)
+                    self.ctx.queue_tracker_refresh(self.ctx.tracker_model.check_locations([location_id]))
 
             def victory_button_callback(self, button):
                 self.ctx.items_received.append("__Victory__")
@@ -668,38 +595,56 @@ class ManualContext(SuperContext):
         self.ui_task = asyncio.create_task(self.ui.async_run(), name="UI")
 
 async def game_watcher_manual(ctx: ManualContext):
+    # sleeps until something is checked, victory is clicked or death link changes (see WatcherFlag),
+    #   then sends everything that's pending in one batch
+    exit_wait = asyncio.create_task(ctx.exit_event.wait())
+
     while not ctx.exit_event.is_set():
-        if ctx.syncing == True:
-            sync_msg = [{'cmd': 'Sync'}]
-            if ctx.locations_checked:
-                sync_msg.append({"cmd": "LocationChecks", "locations": list(ctx.locations_checked)})
-            await ctx.send_msgs(sync_msg)
+        watcher_wait = asyncio.create_task(ctx.watcher_event.wait())
+        await asyncio.wait([watcher_wait, exit_wait], return_when=asyncio.FIRST_COMPLETED)
+        watcher_wait.cancel()
+
+        if ctx.exit_event.is_set():
+            break
+
+        # cleared before reading the flags, so anything set while we're sending wakes us up again
+        ctx.watcher_event.clear()
+        messages = []
+
+        if ctx.syncing:
             ctx.syncing = False
+            messages.append({'cmd': 'Sync'})
+            if ctx.locations_checked:
+                messages.append({"cmd": "LocationChecks", "locations": list(ctx.locations_checked)})
+        ctx.locations_checked = []
 
+        # death link goes through CommonContext's own helpers, which only send while connected to the server
         if ctx.set_deathlink:
             ctx.set_deathlink = False
             await ctx.update_death_link(True)
 
         if ctx.deathlink_out:
             ctx.deathlink_out = False
-            await ctx.send_death()
-
-        sending = []
-        victory = ("__Victory__" in ctx.items_received)
-        ctx.locations_checked = sending
-        message = [{"cmd": 'LocationChecks', "locations": sending}]
-        await ctx.send_msgs(message)
-        if not ctx.finished_game and victory:
-            await ctx.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}])
+            # send_death needs our slot's name, which we only have once the server has sent Connected
+            if ctx.slot in ctx.player_names:
+                await ctx.send_death()
+
+        if not ctx.finished_game and "__Victory__" in ctx.items_received:
+            messages.append({"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL})
             ctx.finished_game = True
-        await asyncio.sleep(0.1)
+
+        if messages:
+            await ctx.send_msgs(messages)
+
+    exit_wait.cancel()
 
 
 def read_apmanual_file(apmanual_file):
-    from base64 import b64decode
+    from .Output import decode_apmanual
 
-    with open(apmanual_file, 'r') as f:
-        return json.loads(b64decode(f.read()))
+    # decode_apmanual handles both the compressed format and the legacy base64 one
+    with open(apmanual_file, 'rb') as f:
+        return decode_apmanual(f.read())
 
 
 async def main(args):
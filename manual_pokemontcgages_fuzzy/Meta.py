@@ -72,3 +72,7 @@ world_description: str = set_world_description("""
 world_webworld: ManualWeb = set_world_webworld(ManualWeb())
 
 enable_region_diagram = bool(meta_table.get("enable_region_diagram", False))
+write_stage_timings = bool(meta_table.get("write_stage_timings", False))
+# Manual Clients older than 2026_10_19 only read the legacy base64 .apmanual files, and the launcher opens .apmanual files
+#   with whichever installed Manual apworld has the newest client, so the compressed format is only written when this is enabled
+compress_apmanual = bool(meta_table.get("compress_apmanual", False))
@@ -0,0 +1,32 @@
+import json
+import zlib
+from base64 import b64decode, b64encode
+
+# .apmanual files start with these magic bytes, followed by a version byte, then the zlib compressed JSON of the client data.
+# Files that don't start with the magic bytes are the legacy format: base64 of the plain JSON.
+APMANUAL_MAGIC = b"APMANUAL"
+APMANUAL_VERSION = 1
+
+
+def encode_apmanual(data: dict) -> bytes:
+    """Returns the bytes of a (current version) .apmanual file for the given client data."""
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    return APMANUAL_MAGIC + bytes([APMANUAL_VERSION]) + zlib.compress(body, 9)
+
+
+def encode_legacy_apmanual(data: dict) -> bytes:
+    """Returns the bytes of a legacy base64 .apmanual file for the given client data, which every Manual Client can read."""
+    return b64encode(bytes(json.dumps(data), 'utf-8'))
+
+
+def decode_apmanual(contents: bytes) -> dict:
+    """Returns the client data of an .apmanual file, in either the current format or the legacy base64 one."""
+    if not contents.startswith(APMANUAL_MAGIC):
+        return json.loads(b64decode(contents))
+
+    version = contents[len(APMANUAL_MAGIC)]
+    if version > APMANUAL_VERSION:
+        raise Exception(f"This .apmanual file is version {version}, but this client only reads up to version {APMANUAL_VERSION}. Please update your Manual Client.")
+
+    return json.loads(zlib.decompress(contents[len(APMANUAL_MAGIC) + 1:]))
@@ -1,8 +1,9 @@
 from BaseClasses import Entrance, MultiWorld, Region
-from .Helpers import is_category_enabled, is_location_enabled
+from .Helpers import get_enabled_locations
 from .Data import region_table
-from .Locations import ManualLocation, location_name_to_location
+from .Locations import ManualLocation, location_name_to_location, region_to_locations
 from worlds.AutoWorld import World
+from .hooks.World import before_create_locations
 
 
 if not region_table:
@@ -32,11 +33,7 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
         if not exit_array:
             exit_array = None
 
-        locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+        locations = [location["name"] for location in get_enabled_locations(multiworld, player, region_to_locations.get(region, []))]
 
         new_region = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
@@ -57,6 +54,8 @@ def create_region(world: World, multiworld: MultiWorld, player: int, name: str,
     ret = Region(name, player, multiworld)
 
     if locations:
+        locations = before_create_locations(locations, name, world, multiworld, player)
+
         for location in locations:
             loc_id = world.location_name_to_id.get(location, 0)
             locationObj = ManualLocation(player, location, loc_id, ret)
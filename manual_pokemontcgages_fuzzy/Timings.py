@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+from functools import wraps
+from threading import Lock, local
+from time import perf_counter
+
+# AP runs these on several threads at once after fill (write_multidata runs fill_slot_data and extend_hint_information
+#   next to generate_output), and they're the last stages that always run, so the summary is logged once all of them are done
+OUTPUT_STAGES = ("generate_output", "fill_slot_data", "extend_hint_information")
+
+
+class StageMeasurement:
+    """Times one run of a stage or of one of its hooks, for use with 'with'. Made by StageTimer.stage() and StageTimer.measure()."""
+    __slots__ = ("timer", "stage", "part", "start", "hook_seconds_at_start", "nested_seconds", "parent")
+
+    def __init__(self, timer: "StageTimer", stage: str, part: str):
+        self.timer = timer
+        self.stage = stage
+        self.part = part
+        self.start = 0.0
+        self.hook_seconds_at_start = 0.0
+        # time spent in other stages that ran inside this measurement (like create_item inside create_items or its hooks)
+        self.nested_seconds = 0.0
+        self.parent: "StageMeasurement" = None
+
+    def __enter__(self):
+        active = self.timer.active_measurements()
+        self.parent = active[-1] if active else None
+        active.append(self)
+
+        self.hook_seconds_at_start = self.timer.hook_seconds.get(self.stage, 0.0)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = perf_counter() - self.start
+        self.timer.active_measurements().pop()
+
+        # nested stages have their own entries, so they're not counted in this one too
+        seconds = elapsed - self.nested_seconds
+
+        if self.part == "core":
+            # the hooks that ran inside this stage have their own entries, so they're not counted as core time too
+            seconds -= self.timer.hook_seconds.get(self.stage, 0.0) - self.hook_seconds_at_start
+
+        if self.parent is not None:
+            # a whole nested stage is left out of whatever it ran in. for a hook, only the stages nested in it are passed up,
+            #   since the rest of the hook's time is already left out of its stage's core time above
+            self.parent.nested_seconds += elapsed if self.part == "core" else self.nested_seconds
+
+        self.timer.add(self.stage, self.part, seconds)
+        return False
+
+
+class StageTimer:
+    """Adds up how long Manual core and each hook took in each world stage, for one player.\n
+    Usage:
+        @timed_stage
+        def create_regions(self):
+            with self.stage_timer.measure("create_regions", "before_create_regions"):
+                before_create_regions(self, self.multiworld, self.player)
+            ...
+    """
+    def __init__(self):
+        # stage -> part -> [total seconds, calls]
+        self.stages: dict[str, dict[str, list]] = {}
+        # stage -> seconds spent in that stage's hooks, so the core time can leave them out
+        self.hook_seconds: dict[str, float] = {}
+        # the measurements running right now on each thread, innermost last (output stages of one player can run in parallel)
+        self.active = local()
+
+    def active_measurements(self) -> list:
+        if not hasattr(self.active, "measurements"):
+            self.active.measurements = []
+        return self.active.measurements
+
+    def stage(self, stage: str) -> StageMeasurement:
+        """Times a whole stage. Whatever isn't measured as a hook inside of it is recorded as 'core'."""
+        return StageMeasurement(self, stage, "core")
+
+    def measure(self, stage: str, part: str) -> StageMeasurement:
+        """Times one hook call (or any other named part) of a stage."""
+        return StageMeasurement(self, stage, part)
+
+    def add(self, stage: str, part: str, seconds: float):
+        totals = self.stages.setdefault(stage, {}).setdefault(part, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += 1
+
+        if part != "core":
+            self.hook_seconds[stage] = self.hook_seconds.get(stage, 0.0) + seconds
+
+    def to_dict(self) -> dict:
+        return {
+            stage: {part: {"seconds": seconds, "calls": calls} for part, (seconds, calls) in parts.items()}
+                for stage, parts in self.stages.items()
+        }
+
+
+def timed_stage(method):
+    """Decorator for World stage methods. Times the whole method as 'core' on self.stage_timer, under the method's name,
+    leaving out any hooks inside of it that are timed with self.stage_timer.measure(), then tells self.generation_timings it's done."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.stage_timer.stage(method.__name__):
+            result = method(self, *args, **kwargs)
+
+        self.generation_timings.finish_stage(method.__name__)
+        return result
+
+    return wrapper
+
+
+def summarize_stage_timers(timers: dict[str, StageTimer]) -> dict:
+    """Combines the timers of every player (keyed by player name) into one summary.\n
+    Each stage/part gets the total seconds across players, the slowest player's seconds and the number of calls.
+    """
+    stages = {}
+
+    for timer in timers.values():
+        for stage, parts in timer.stages.items():
+            for part, (seconds, calls) in parts.items():
+                summary = stages.setdefault(stage, {}).setdefault(part, {"seconds": 0.0, "max_seconds": 0.0, "calls": 0})
+                summary["seconds"] += seconds
+                summary["max_seconds"] = max(summary["max_seconds"], seconds)
+                summary["calls"] += calls
+
+    return {
+        "players": len(timers),
+        "stages": stages,
+        "per_player": {player_name: timer.to_dict() for player_name, timer in timers.items()}
+    }
+
+
+def log_stage_summary(game: str, summary: dict):
+    lines = [f"{game} stage timings for {summary['players']} player(s) (total / slowest player):"]
+
+    for stage, parts in summary["stages"].items():
+        stage_total = sum(part["seconds"] for part in parts.values())
+        part_text = ", ".join(
+            f"{part} {values['seconds']:.3f}s / {values['max_seconds']:.3f}s" for part, values in parts.items()
+        )
+        lines.append(f"    {stage}: {stage_total:.3f}s ({part_text})")
+
+    logging.info("\n".join(lines))
+
+
+def write_stage_summary(path: str, summary: dict):
+    with open(path, "w", encoding="utf-8") as timings_file:
+        json.dump(summary, timings_file, indent=2)
+
+
+class GenerationTimings:
+    """The stage timers of every player of this game in one multiworld. Use get_generation_timings() to get one."""
+    def __init__(self, multiworld, game: str):
+        self.multiworld = multiworld
+        self.game = game
+        self.timers: dict[int, StageTimer] = {}
+        self.output_stages_left = len(multiworld.get_game_players(game)) * len(OUTPUT_STAGES)
+        self.lock = Lock()
+
+    def finish_stage(self, stage: str):
+        """Counts a player finishing one of OUTPUT_STAGES, and logs the summary once every player has finished all of them."""
+        if stage not in OUTPUT_STAGES:
+            return
+
+        with self.lock:
+            self.output_stages_left -= 1
+            if self.output_stages_left != 0:
+                return
+
+        log_stage_summary(self.game, self.summarize())
+
+    def timer_for(self, player: int) -> StageTimer:
+        return self.timers.setdefault(player, StageTimer())
+
+    def summarize(self) -> dict:
+        return summarize_stage_timers({
+            self.multiworld.get_player_name(player): timer for player, timer in sorted(self.timers.items())
+        })
+
+
+def get_generation_timings(multiworld, game: str) -> GenerationTimings:
+    """The timings of this game's players in the multiworld. They're kept on the multiworld itself,
+    so they go away with it and two generations in one process never share them."""
+    if not hasattr(multiworld, "manual_generation_timings"):
+        multiworld.manual_generation_timings = {}
+
+    if game not in multiworld.manual_generation_timings:
+        multiworld.manual_generation_timings[game] = GenerationTimings(multiworld, game)
+
+    return multiworld.manual_generation_timings[game]
+
+
+def get_timings_path(spoiler_path: str, game: str) -> str:
+    """The timings file goes next to the spoiler, named the same way (AP_<seed>_Spoiler.txt -> AP_<seed>_<game>_Timings.json)."""
+    directory, filename = os.path.split(spoiler_path)
+    base = filename[:-len("_Spoiler.txt")] if filename.endswith("_Spoiler.txt") else os.path.splitext(filename)[0]
+    return os.path.join(directory, f"{base}_{game}_Timings.json")
@@ -0,0 +1,274 @@
+from collections import Counter
+from typing import Any, Callable, Iterable, Optional
+
+# the victory/goal entry listed with the locations, which isn't a real location id
+VICTORY_KEY = "__Victory__"
+
+
+class TrackerChanges:
+    """What one TrackerModel update changed, so that the view only has to redraw those parts."""
+    __slots__ = ("rebuilt", "item_ids", "item_categories", "added_locations", "removed_locations", "flipped_locations", "location_categories")
+
+    def __init__(self, rebuilt: bool = False):
+        # the categories themselves changed, so the view has to be built again from the model
+        self.rebuilt = rebuilt
+        self.item_ids: set[int] = set()
+        self.item_categories: set[str] = set()
+        # locations newly listed in (added) or taken out of (removed) their categories
+        self.added_locations: set = set()
+        self.removed_locations: set = set()
+        # locations whose reachability flipped
+        self.flipped_locations: set = set()
+        # categories whose totals changed
+        self.location_categories: set[str] = set()
+
+    def __bool__(self) -> bool:
+        return self.rebuilt or bool(self.item_ids or self.item_categories or self.added_locations or self.removed_locations
+                                    or self.flipped_locations or self.location_categories)
+
+    def merge(self, other: "TrackerChanges") -> "TrackerChanges":
+        self.rebuilt = self.rebuilt or other.rebuilt
+        self.item_ids |= other.item_ids
+        self.item_categories |= other.item_categories
+        self.added_locations |= other.added_locations
+        self.removed_locations |= other.removed_locations
+        self.flipped_locations |= other.flipped_locations
+        self.location_categories |= other.location_categories
+        return self
+
+
+class TrackerModel:
+    """Everything the Manual client's tracker shows (received items and remaining locations by category, their counts,
+    what's reachable and what's hinted), kept without any Kivy so it can be updated and benchmarked headless.\n
+    Feed it the server's packets with on_package(). Every update returns a TrackerChanges for the view to redraw.
+    """
+    def __init__(self, get_item: Callable[[int], dict], get_location: Callable[[int], dict], is_category_hidden: Callable[[str], bool],
+                 get_location_id: Callable[[str], Optional[int]]):
+        self.get_item = get_item
+        self.get_location = get_location
+        self.is_category_hidden = is_category_hidden
+        self.get_location_id = get_location_id
+
+        # category -> the received item ids listed in it, in the order they were first received
+        self.item_categories: dict[str, dict[int, None]] = {"(No Category)": {}}
+        # category -> the missing location ids (and VICTORY_KEY) listed in it
+        self.location_categories: dict[str, dict[Any, None]] = {"(No Category)": {}, "(Hinted)": {}}
+        # location id -> the categories it's listed in, and category -> how many of its listed locations are reachable
+        self.location_id_categories: dict[Any, list[str]] = {}
+        self.location_category_reachable: dict[str, int] = {}
+
+        self.received_item_counts: Counter = Counter()
+        self.received_items_count = 0
+        self.missing_locations: set[int] = set()
+        self.hinted_locations: set[int] = set()
+        # the location ids and event names that Universal Tracker says are in logic
+        self.reachable_locations: set[int] = set()
+        self.reachable_events: set[str] = set()
+
+        self.victory_location: dict = {"name": VICTORY_KEY}
+        self.victory_categories: set[str] = set()
+
+    ###
+    # Updates
+    ###
+
+    def on_package(self, cmd: str, args: dict) -> TrackerChanges:
+        """Updates the model from a server packet, the same way CommonContext.on_package updates the context."""
+        if cmd == "Connected":
+            self.missing_locations = set(args.get("missing_locations", []))
+            return TrackerChanges(rebuilt=True)
+
+        if cmd == "ReceivedItems":
+            return self.receive_items(args["items"], args["index"])
+
+        if cmd == "RoomUpdate" and "checked_locations" in args:
+            return self.check_locations(args["checked_locations"])
+
+        return TrackerChanges()
+
+    def build(self, items: Iterable[dict], victory_location: dict) -> TrackerChanges:
+        """Works out the item and location categories again, from the item table and the missing locations."""
+        self.item_categories = {"(No Category)": {}}
+        self.location_categories = {"(No Category)": {}, "(Hinted)": {}}
+        self.location_id_categories = {}
+        self.location_category_reachable = {"(No Category)": 0, "(Hinted)": 0}
+        self.victory_location = victory_location
+        self.victory_categories = set()
+
+        # seed all category names to start
+        for item in items:
+            for category in item.get("category", []):
+                if not self.is_category_hidden(category):
+                    self.item_categories.setdefault(category, {})
+
+        for location_id in self.missing_locations:
+            self._list_location(location_id)
+
+        for category in victory_location.get("category", []):
+            if category not in self.location_categories:
+                self.location_categories[category] = {}
+                self.location_category_reachable[category] = 0
+                self.victory_categories.add(category)
+
+        if not self.victory_categories:
+            self.victory_categories.add("(No Category)")
+
+        for category in self.victory_categories:
+            self._list_location_in(category, VICTORY_KEY)
+
+        # list every item that was already received under its categories again
+        for item_id in self.received_item_counts:
+            self._list_item(item_id)
+
+        return TrackerChanges(rebuilt=True)
+
+    def receive_items(self, network_items: Iterable, index: int) -> TrackerChanges:
+        """Counts the items of a ReceivedItems packet. Like CommonContext, index 0 means every item is being sent again,
+        and a packet that doesn't start where the last one ended is ignored (the client resyncs instead)."""
+        changes = TrackerChanges()
+
+        if index == 0:
+            changes.item_ids.update(self.received_item_counts.keys())
+            self.received_item_counts.clear()
+            self.received_items_count = 0
+        elif index != self.received_items_count:
+            return changes
+
+        for network_item in network_items:
+            # NetworkItems from the client, or the plain dicts/lists of a recorded packet
+            if hasattr(network_item, "item"):
+                item_id = network_item.item
+            elif isinstance(network_item, dict):
+                item_id = network_item["item"]
+            else:
+                item_id = network_item[0]
+            self.received_item_counts[item_id] += 1
+            self.received_items_count += 1
+            changes.item_ids.add(item_id)
+
+        for item_id in changes.item_ids:
+            changes.item_categories.update(self._list_item(item_id))
+
+        return changes
+
+    def check_locations(self, location_ids: Iterable[int]) -> TrackerChanges:
+        changes = TrackerChanges()
+
+        for location_id in location_ids:
+            if location_id not in self.missing_locations:
+                continue
+
+            self.missing_locations.discard(location_id)
+            changes.removed_locations.add(location_id)
+
+            for category in self.location_id_categories.pop(location_id, []):
+                del self.location_categories[category][location_id]
+                if location_id in self.reachable_locations:
+                    self.location_category_reachable[category] -= 1
+                changes.location_categories.add(category)
+
+        return changes
+
+    def set_reachable(self, locations: Optional[Iterable[str]] = None, events: Optional[Iterable[str]] = None) -> TrackerChanges:
+        """Sets the location names and events that Universal Tracker says are in logic. Leave either as None to keep it as is."""
+        changes = TrackerChanges()
+
+        if locations is not None:
+            reachable_locations = set(self.get_location_id(name) for name in locations)
+            reachable_locations.discard(None)
+
+            # only the locations that went in or out of logic need anything redrawn
+            for location_id in self.reachable_locations ^ reachable_locations:
+                self._flip_location(location_id, location_id in reachable_locations, changes)
+
+            self.reachable_locations = reachable_locations
+
+        if events is not None:
+            events = set(events)
+            if (VICTORY_KEY in events) != (VICTORY_KEY in self.reachable_events):
+                self._flip_location(VICTORY_KEY, VICTORY_KEY in events, changes)
+
+            self.reachable_events = events
+
+        return changes
+
+    def add_hinted_locations(self, location_ids: Iterable[int]) -> TrackerChanges:
+        """Lists the missing locations among location_ids under "(Hinted)" too."""
+        new_hints = set(location_ids) & self.missing_locations - self.hinted_locations
+        changes = TrackerChanges()
+
+        if new_hints:
+            self.hinted_locations |= new_hints
+            for location_id in new_hints:
+                self._list_location_in("(Hinted)", location_id)
+                changes.added_locations.add(location_id)
+            changes.location_categories.add("(Hinted)")
+
+        return changes
+
+    ###
+    # Lookups for the view
+    ###
+
+    def get_item_categories(self, item_id: int) -> list[str]:
+        """The listed categories that the item shows up under."""
+        categories = self.get_item(item_id).get("category") or ["(No Category)"]
+        return [category for category in categories if category in self.item_categories]
+
+    def get_item_category_count(self, category: str) -> int:
+        return sum(self.received_item_counts[item_id] for item_id in self.item_categories[category])
+
+    def is_location_reachable(self, location_id) -> bool:
+        if location_id == VICTORY_KEY:
+            return VICTORY_KEY in self.reachable_events
+
+        return location_id in self.reachable_locations
+
+    def get_location_categories(self, location_id) -> list[str]:
+        """The categories that the location (or VICTORY_KEY) is listed in."""
+        return self.location_id_categories.get(location_id, [])
+
+    def get_location_category_counts(self, category: str) -> tuple[int, int]:
+        """Returns (reachable, total) for the locations listed in the category."""
+        return self.location_category_reachable.get(category, 0), len(self.location_categories[category])
+
+    ###
+    # Internal
+    ###
+
+    def _list_item(self, item_id: int) -> list[str]:
+        categories = self.get_item_categories(item_id)
+        for category in categories:
+            self.item_categories[category].setdefault(item_id, None)
+        return categories
+
+    def _list_location(self, location_id: int):
+        location = self.get_location(location_id)
+        if not location:
+            return
+
+        categories = [category for category in location.get("category", []) if not self.is_category_hidden(category)]
+        if not location.get("category"):
+            categories = ["(No Category)"]
+        if location_id in self.hinted_locations:
+            categories.append("(Hinted)")
+
+        for category in categories:
+            self._list_location_in(category, location_id)
+
+    def _list_location_in(self, category: str, location_id):
+        if location_id in self.location_categories.setdefault(category, {}):
+            return
+
+        self.location_categories[category][location_id] = None
+        self.location_id_categories.setdefault(location_id, []).append(category)
+        self.location_category_reachable.setdefault(category, 0)
+        if self.is_location_reachable(location_id):
+            self.location_category_reachable[category] += 1
+
+    def _flip_location(self, location_id, reachable: bool, changes: TrackerChanges):
+        changes.flipped_locations.add(location_id)
+
+        for category in self.location_id_categories.get(location_id, []):
+            self.location_category_reachable[category] += 1 if reachable else -1
+            changes.location_categories.add(category)
@@ -1,7 +1,6 @@
-from base64 import b64encode
 import logging
 import os
-import json
+from collections import Counter
 from typing import Callable, Optional
 
 import Utils
@@ -10,27 +9,30 @@ from worlds.LauncherComponents import Component, SuffixIdentifier, components, T
 
 from .Data import item_table, location_table, region_table, category_table, meta_table
 from .Game import game_name, filler_item_name, starting_items
-from .Meta import world_description, world_webworld, enable_region_diagram
+from .Meta import world_description, world_webworld, enable_region_diagram, write_stage_timings, compress_apmanual
 from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups, item_category_to_names
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
 from .Regions import create_regions
 from .Items import ManualItem
 from .Rules import set_rules
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option
+from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, PoolSelection, LockedPlacements, EnablementTable
+from .Output import encode_apmanual, encode_legacy_apmanual
+from .Timings import GenerationTimings, StageTimer, timed_stage, get_generation_timings, write_stage_summary, get_timings_path
 
-from BaseClasses import ItemClassification, Tutorial, Item
+from BaseClasses import ItemClassification, Tutorial, Item, MultiWorld, CollectionState
 from Options import PerGameCommonOptions
 from worlds.AutoWorld import World, WebWorld
 
 from .hooks.World import \
-    hook_get_filler_item_name, before_create_regions, after_create_regions, \
+    hook_reset_generation_caches, hook_get_filler_item_name, before_create_regions, after_create_regions, \
     before_create_items_starting, before_create_items_filler, after_create_items, \
     before_create_item, after_create_item, \
-    before_set_rules, after_set_rules, \
-    before_generate_basic, after_generate_basic, \
+    hook_get_item_classification_key, hook_get_item_classifications, \
+    before_set_rules, after_set_rules, after_collect_item, after_remove_item, \
+    before_generate_basic, after_generate_basic, before_pre_fill, \
     before_fill_slot_data, after_fill_slot_data, before_write_spoiler, \
     before_extend_hint_information, after_extend_hint_information
 from .hooks.Data import hook_interpret_slot_data
@@ -53,11 +55,13 @@ class ManualWorld(World):
     item_name_to_id = item_name_to_id
     item_name_to_item = item_name_to_item
     item_name_groups = item_name_groups
+    item_category_to_names = item_category_to_names
 
     filler_item_name = filler_item_name
 
     item_counts = {}
     start_inventory = {}
+    trimmed_item_counts = {}
 
     location_id_to_name = location_id_to_name
     location_name_to_id = location_name_to_id
@@ -65,6 +69,20 @@ class ManualWorld(World):
     location_name_groups = location_name_groups
     victory_names = victory_names
 
+    # item classifications from hook_get_item_classifications, keyed by hook_get_item_classification_key,
+    #   so players with the same key share them and the item tables above are never modified
+    item_classification_overlays = {}
+
+    def __init__(self, multiworld: MultiWorld, player: int):
+        super().__init__(multiworld, player)
+
+        # how long Manual core and each hook took per stage, for every player of this game in this multiworld
+        #   (stages that run inside other stages, like create_item inside create_items, are only counted under their own name)
+        self.generation_timings: GenerationTimings = get_generation_timings(multiworld, self.game)
+        self.stage_timer: StageTimer = self.generation_timings.timer_for(player)
+        self.item_classifications: Optional[dict[str, dict]] = None
+        self.enablement: Optional[EnablementTable] = None
+
     def get_filler_item_name(self) -> str:
         return hook_get_filler_item_name(self, self.multiworld, self.player) or self.filler_item_name
 
@@ -83,10 +101,24 @@ class ManualWorld(World):
     @classmethod
     def stage_assert_generate(cls, multiworld) -> None:
         runGenerationDataValidation()
+        cls.item_classification_overlays = {}
+        hook_reset_generation_caches(multiworld)
 
+    @classmethod
+    def stage_write_spoiler(cls, multiworld, spoiler_handle) -> None:
+        # Enable this in Meta.json to write the stage timings next to the spoiler
+        #   (the summary itself is logged once the output stages are done, see GenerationTimings.finish_stage)
+        if write_stage_timings:
+            write_stage_summary(get_timings_path(spoiler_handle.name, cls.game), get_generation_timings(multiworld, cls.game).summarize())
 
+
+    @timed_stage
     def create_regions(self):
-        before_create_regions(self, self.multiworld, self.player)
+        with self.stage_timer.measure("create_regions", "before_create_regions"):
+            before_create_regions(self, self.multiworld, self.player)
+
+        # options are final now, so work out what's enabled for this player once
+        self.enablement = EnablementTable(self.multiworld, self.player)
 
         create_regions(self, self.multiworld, self.player)
 
@@ -99,8 +131,10 @@ class ManualWorld(World):
         location_game_complete.place_locked_item(
             ManualItem("__Victory__", ItemClassification.progression, None, player=self.player))
 
-        after_create_regions(self, self.multiworld, self.player)
+        with self.stage_timer.measure("create_regions", "after_create_regions"):
+            after_create_regions(self, self.multiworld, self.player)
 
+    @timed_stage
     def create_items(self):
         # Generate item pool
         pool = []
@@ -154,11 +188,15 @@ class ManualWorld(World):
                     raise Exception(f"Item {name}'s 'local_early' has an invalid value of '{item['local_early']}'. \nA boolean or an integer was expected.")
 
 
-        pool = before_create_items_starting(pool, self, self.multiworld, self.player)
+        with self.stage_timer.measure("create_items", "before_create_items_starting"):
+            pool = before_create_items_starting(pool, self, self.multiworld, self.player)
 
         items_started = []
 
         if starting_items:
+            # starting items are marked as picked and only taken out of the pool once, after every block is processed
+            selection = PoolSelection(pool)
+
             for starting_item_block in starting_items:
                 if not resolve_yaml_option(self.multiworld, self.player, starting_item_block):
                     continue
@@ -171,42 +209,43 @@ class ManualWorld(World):
                         continue
 
                 # start with the full pool of items
-                items = pool
+                item_names = None
 
                 # if the setting lists specific item names, limit the items to just those
                 if "items" in starting_item_block:
-                    items = [item for item in pool if item.name in starting_item_block["items"]]
+                    item_names = set(starting_item_block["items"])
 
                 # if the setting lists specific item categories, limit the items to ones that have any of those categories
                 if "item_categories" in starting_item_block:
-                    items_in_categories = [item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0]
-                    items = [item for item in pool if item.name in items_in_categories]
-
-                self.random.shuffle(items)
+                    item_names = {item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0}
 
                 # if the setting lists a specific number of random items that should be pulled, only use a subset equal to that number
-                if "random" in starting_item_block:
-                    items = items[0:starting_item_block["random"]]
+                picked = selection.pick_shuffled(self.random, item_names, starting_item_block.get("random"))
 
-                for starting_item in items:
+                for starting_item in picked:
                     items_started.append(starting_item)
                     self.multiworld.push_precollected(starting_item)
-                    pool.remove(starting_item)
 
-        self.start_inventory = {i.name: items_started.count(i) for i in items_started}
+            pool = selection.compact()
+
+        self.start_inventory = dict(Counter(i.name for i in items_started))
 
-        pool = before_create_items_filler(pool, self, self.multiworld, self.player)
+        with self.stage_timer.measure("create_items", "before_create_items_filler"):
+            pool = before_create_items_filler(pool, self, self.multiworld, self.player)
         pool = self.adjust_filler_items(pool, traps)
-        pool = after_create_items(pool, self, self.multiworld, self.player)
+        with self.stage_timer.measure("create_items", "after_create_items"):
+            pool = after_create_items(pool, self, self.multiworld, self.player)
 
         # need to put all of the items in the pool so we can have a full state for placement
         # then will remove specific item placements below from the overall pool
         self.multiworld.itempool += pool
 
+    @timed_stage
     def create_item(self, name: str) -> Item:
-        name = before_create_item(name, self, self.multiworld, self.player)
+        with self.stage_timer.measure("create_item", "before_create_item"):
+            name = before_create_item(name, self, self.multiworld, self.player)
 
-        item = self.item_name_to_item[name]
+        item = self.get_item_data(name)
         classification = ItemClassification.filler
 
         if "trap" in item and item["trap"]:
@@ -224,71 +263,90 @@ class ManualWorld(World):
         item_object = ManualItem(name, classification,
                         self.item_name_to_id[name], player=self.player)
 
-        item_object = after_create_item(item_object, self, self.multiworld, self.player)
+        with self.stage_timer.measure("create_item", "after_create_item"):
+            item_object = after_create_item(item_object, self, self.multiworld, self.player)
 
         return item_object
 
+    @timed_stage
     def set_rules(self):
-        before_set_rules(self, self.multiworld, self.player)
+        with self.stage_timer.measure("set_rules", "before_set_rules"):
+            before_set_rules(self, self.multiworld, self.player)
 
         set_rules(self, self.multiworld, self.player)
 
-        after_set_rules(self, self.multiworld, self.player)
+        with self.stage_timer.measure("set_rules", "after_set_rules"):
+            after_set_rules(self, self.multiworld, self.player)
 
+    @timed_stage
     def generate_basic(self):
-        before_generate_basic(self, self.multiworld, self.player)
+        with self.stage_timer.measure("generate_basic", "before_generate_basic"):
+            before_generate_basic(self, self.multiworld, self.player)
 
         # Handle item forbidding
         manual_locations_with_forbid = {location['name']: location for location in location_name_to_location.values() if "dont_place_item" in location or "dont_place_item_category" in location}
         locations_with_forbid = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_forbid.keys()]
         for location in locations_with_forbid:
             manual_location = manual_locations_with_forbid[location.name]
-            forbidden_item_names = []
+            forbidden_item_names = set()
 
             if manual_location.get("dont_place_item"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if i["name"] in manual_location["dont_place_item"]])
+                forbidden_item_names.update(name for name in manual_location["dont_place_item"] if name in item_name_to_item)
 
             if manual_location.get("dont_place_item_category"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])])
+                forbidden_item_names.update(self.get_item_names_in_categories(manual_location["dont_place_item_category"]))
 
             if forbidden_item_names:
-                forbid_items_for_player(location, set(forbidden_item_names), self.player)
+                forbid_items_for_player(location, forbidden_item_names, self.player)
 
         # Handle specific item placements using fill_restrictive
         manual_locations_with_placements = {location['name']: location for location in location_name_to_location.values() if "place_item" in location or "place_item_category" in location}
         locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements.keys()]
+
+        # this player's pool items by name, along with their position in the pool so eligible items keep the pool's order
+        pool_items_by_name = {}
+        placements = LockedPlacements(self.multiworld)
+        if locations_with_placements:
+            for index, item in enumerate(self.multiworld.itempool):
+                if item.player == self.player:
+                    pool_items_by_name.setdefault(item.name, []).append((index, item))
+
         for location in locations_with_placements:
             manual_location = manual_locations_with_placements[location.name]
             eligible_items = []
-            eligible_item_names = []
-            forbidden_item_names = []
+            eligible_item_names = set()
+            forbidden_item_names = set()
             place_messages = []
             forbid_messages = []
 
             #First we get possible items names
             if manual_location.get("place_item"):
-                eligible_item_names += manual_location["place_item"]
+                eligible_item_names.update(manual_location["place_item"])
                 place_messages.append('", "'.join(manual_location["place_item"]))
 
             if manual_location.get("place_item_category"):
-                eligible_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["place_item_category"])]
+                eligible_item_names.update(self.get_item_names_in_categories(manual_location["place_item_category"]))
                 place_messages.append('", "'.join(manual_location["place_item_category"]) + " category(ies)")
 
             # Second we check for forbidden items names
             if manual_location.get("dont_place_item"):
-                forbidden_item_names += manual_location["dont_place_item"]
+                forbidden_item_names.update(manual_location["dont_place_item"])
                 forbid_messages.append('", "'.join(manual_location["dont_place_item"]) + ' items')
 
             if manual_location.get("dont_place_item_category"):
-                forbidden_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])]
+                forbidden_item_names.update(self.get_item_names_in_categories(manual_location["dont_place_item_category"]))
                 forbid_messages.append('", "'.join(manual_location["dont_place_item_category"]) + ' category(ies)')
 
             # If we forbid some names, check for those in the possible names and remove them
             if forbidden_item_names:
-                eligible_item_names = [name for name in eligible_item_names if name not in forbidden_item_names]
+                eligible_item_names -= forbidden_item_names
 
             if eligible_item_names:
-                eligible_items = [item for item in self.multiworld.itempool if item.player == self.player and item.name in eligible_item_names]
+                eligible_items = sorted(
+                    (entry for name in eligible_item_names for entry in pool_items_by_name.get(name, []) if not placements.is_placed(entry[1])),
+                    key=lambda entry: entry[0]
+                )
+                eligible_items = [item for _, item in eligible_items]
 
             if len(eligible_items) == 0:
                 nl = "\n"
@@ -296,26 +354,32 @@ class ManualWorld(World):
                     raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}".\n    No items that match "{f"{nl}     or ".join(place_messages)}"\n    Maybe because of forbidden "{f"{nl}     or ".join(forbid_messages)}"')
                 raise Exception(f'Could not find a suitable item to place at "{manual_location["name"]}". \n    No items that match "{f"{nl}     or ".join(place_messages)}"')
 
+            # placed items aren't eligible again, and they all get removed from the pool together below
             item_to_place = self.random.choice(eligible_items)
-            location.place_locked_item(item_to_place)
-
-            # remove the item we're about to place from the pool so it isn't placed twice
-            self.multiworld.itempool.remove(item_to_place)
+            placements.place(location, item_to_place)
 
+        placements.remove_from_itempool()
 
-        after_generate_basic(self, self.multiworld, self.player)
+        with self.stage_timer.measure("generate_basic", "after_generate_basic"):
+            after_generate_basic(self, self.multiworld, self.player)
 
         # Enable this in Meta.json to generate a diagram of your manual.  Only works on 0.4.4+
         if enable_region_diagram:
             from Utils import visualize_regions
             visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
 
+    @timed_stage
     def pre_fill(self):
+        with self.stage_timer.measure("pre_fill", "before_pre_fill"):
+            before_pre_fill(self, self.multiworld, self.player)
+
         # DataValidation after all the hooks are done but before fill
         runPreFillDataValidation(self, self.multiworld)
 
+    @timed_stage
     def fill_slot_data(self):
-        slot_data = before_fill_slot_data({}, self, self.multiworld, self.player)
+        with self.stage_timer.measure("fill_slot_data", "before_fill_slot_data"):
+            slot_data = before_fill_slot_data({}, self, self.multiworld, self.player)
 
         # slot_data["DeathLink"] = bool(self.multiworld.death_link[self.player].value)
         common_options = set(PerGameCommonOptions.type_hints.keys())
@@ -324,21 +388,40 @@ class ManualWorld(World):
                 continue
             slot_data[option_key] = get_option_value(self.multiworld, self.player, option_key)
 
-        slot_data = after_fill_slot_data(slot_data, self, self.multiworld, self.player)
+        with self.stage_timer.measure("fill_slot_data", "after_fill_slot_data"):
+            slot_data = after_fill_slot_data(slot_data, self, self.multiworld, self.player)
 
         return slot_data
 
     def generate_output(self, output_directory: str):
-        data = self.client_data()
-        filename = f"{self.multiworld.get_out_file_name_base(self.player)}.apmanual"
-        with open(os.path.join(output_directory, filename), 'wb') as f:
-            f.write(b64encode(bytes(json.dumps(data), 'utf-8')))
-
+        with self.stage_timer.stage("generate_output"):
+            data = self.client_data()
+            filename = f"{self.multiworld.get_out_file_name_base(self.player)}.apmanual"
+            # Enable this in Meta.json to write the smaller compressed .apmanual files, which need a 2026_10_19+ Manual Client
+            with open(os.path.join(output_directory, filename), 'wb') as f:
+                f.write(encode_apmanual(data) if compress_apmanual else encode_legacy_apmanual(data))
+
+        self.generation_timings.finish_stage("generate_output")
+
+    def collect(self, state: CollectionState, item: Item) -> bool:
+        changed = super().collect(state, item)
+        after_collect_item(self, state, changed, item)
+        return changed
+
+    def remove(self, state: CollectionState, item: Item) -> bool:
+        changed = super().remove(state, item)
+        after_remove_item(self, state, changed, item)
+        return changed
+
+    @timed_stage
     def write_spoiler(self, spoiler_handle):
-        before_write_spoiler(self, self.multiworld, spoiler_handle)
+        with self.stage_timer.measure("write_spoiler", "before_write_spoiler"):
+            before_write_spoiler(self, self.multiworld, spoiler_handle)
 
+    @timed_stage
     def extend_hint_information(self, hint_data: dict[int, dict[int, str]]) -> None:
-        before_extend_hint_information(hint_data, self, self.multiworld, self.player)
+        with self.stage_timer.measure("extend_hint_information", "before_extend_hint_information"):
+            before_extend_hint_information(hint_data, self, self.multiworld, self.player)
         
         for location in self.multiworld.get_locations(self.player):
             if not location.address:
@@ -348,7 +431,8 @@ class ManualWorld(World):
                     hint_data.update({self.player: {}})
                 hint_data[self.player][location.address] = self.location_name_to_location[location.name]["hint_entrance"]
         
-        after_extend_hint_information(hint_data, self, self.multiworld, self.player)
+        with self.stage_timer.measure("extend_hint_information", "after_extend_hint_information"):
+            after_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
     ###
     # Non-standard AP world methods
@@ -384,21 +468,61 @@ class ManualWorld(World):
             self.random.shuffle(fillers)
             self.random.shuffle(traps)
             self.random.shuffle(useful)
+
+            # pick everything to remove first, then filter the pool once instead of calling item_pool.remove() per item
+            removal_counts = Counter()
+            trimmed = {"filler": 0, "trap": 0, "useful": 0}
             for _ in range(0, abs(extras)):
                 popped = None
                 if fillers:
                     popped = fillers.pop()
+                    trimmed["filler"] += 1
                 elif traps:
                     popped = traps.pop()
+                    trimmed["trap"] += 1
                 elif useful:
                     popped = useful.pop()
+                    trimmed["useful"] += 1
                 else:
                     logging.warning("Could not remove enough non-progression items from the pool.")
                     break
-                item_pool.remove(popped)
+                removal_counts[(popped.name, popped.player)] += 1
+
+            # like item_pool.remove(), drop the earliest items that are equal to the popped ones so results match for a seed
+            trimmed_pool = []
+            for item in item_pool:
+                key = (item.name, item.player)
+                if removal_counts[key] > 0:
+                    removal_counts[key] -= 1
+                else:
+                    trimmed_pool.append(item)
+            item_pool = trimmed_pool
+
+            self.trimmed_item_counts = trimmed
+            logging.info(f"{self.game} (player {self.player}) removed {trimmed['filler']} filler, {trimmed['trap']} trap and {trimmed['useful']} useful items to fit its locations.")
 
         return item_pool
 
+    def get_item_data(self, name: str) -> dict:
+        """returns the item table entry for the item name, with this player's classifications from hook_get_item_classifications applied"""
+        if self.item_classifications is None:
+            key = hook_get_item_classification_key(self, self.multiworld, self.player)
+            if key not in self.item_classification_overlays:
+                self.item_classification_overlays[key] = hook_get_item_classifications({}, self, self.multiworld, self.player)
+            self.item_classifications = self.item_classification_overlays[key]
+
+        item = self.item_name_to_item[name]
+        if name in self.item_classifications:
+            return {**item, **self.item_classifications[name]}
+        return item
+
+    def get_item_names_in_categories(self, categories: list[str]) -> set[str]:
+        """returns the names of every item that has any of the given categories"""
+        names = set()
+        for category in categories:
+            names.update(self.item_category_to_names.get(category, ()))
+        return names
+
     def get_item_counts(self, player: Optional[int] = None, reset: bool = False) -> dict[str, int]:
         """returns the player real item count"""
         if player is None:
@@ -410,15 +534,30 @@ class ManualWorld(World):
         return self.item_counts.get(player)
 
     def client_data(self):
+        # only send what's actually in this player's world, so disabled packs and removed locations don't end up in the .apmanual
+        item_names = {item.name for item in get_items_for_player(self.multiworld, self.player, True)}
+        items = {name: item for name, item in self.item_name_to_item.items() if name in item_names}
+
+        location_names = {location.name for location in self.multiworld.get_locations(self.player)}
+        locations = {name: location for name, location in self.location_name_to_location.items() if name in location_names}
+
+        region_names = {region.name for region in self.multiworld.get_regions(self.player)}
+        # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
+        regions = {name: region for name, region in region_table.items() if name in region_names}
+
+        category_names = set()
+        for entry in [*items.values(), *locations.values()]:
+            category_names.update(entry.get("category", []))
+        categories = {name: category for name, category in category_table.items() if name in category_names}
+
         return {
             "game": self.game,
             'player_name': self.multiworld.get_player_name(self.player),
             'player_id': self.player,
-            'items': self.item_name_to_item,
-            'locations': self.location_name_to_location,
-            # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
-            'regions': region_table,
-            'categories': category_table
+            'items': items,
+            'locations': locations,
+            'regions': regions,
+            'categories': categories
         }
 
 ###
@@ -440,7 +579,7 @@ class VersionedComponent(Component):
         self.version = version
 
 def add_client_to_launcher() -> None:
-    version = 2024_09_19 # YYYYMMDD
+    version = 2026_10_19 # YYYYMMDD
     found = False
     for c in components:
         if c.display_name == "Manual Client":
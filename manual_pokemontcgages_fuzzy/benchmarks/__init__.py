@@ -0,0 +1,2 @@
+# benchmarks for this apworld. these aren't used during generation or by the client,
+#   they're run by hand from an Archipelago source checkout (see README.md in this folder)
@@ -0,0 +1,139 @@
+"""Replays a stream of server packets through the client's TrackerModel, without Kivy or a server, and times it.
+
+Run it from the root of an Archipelago source checkout that has this apworld unpacked in worlds/, e.g.:
+
+    python -m worlds.manual_pokemontcgages_fuzzy.benchmarks.client_tracker --batch 1 25 --output client_tracker.json
+
+Without --stream, it makes a stream from this apworld's items and locations: a Connected packet with every location
+missing, then ReceivedItems packets of --batch items each, with a RoomUpdate checking --batch locations after each one.
+Pass --stream with a file of recorded packets (one JSON packet per line, as the server sent them) to replay those instead,
+and --save-stream to write the generated stream out so later runs (or other versions) can replay the exact same packets.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from ..Game import game_name
+from ..Items import item_name_to_item, item_name_to_id
+from ..Locations import location_name_to_location, location_name_to_id
+from ..Tracker import TrackerModel
+
+
+def make_stream(batch: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    item_ids = [
+        item_name_to_id[name] for name, item in item_name_to_item.items() if name in item_name_to_id
+            for _ in range(int(item.get("count", 1)))
+    ]
+    location_ids = [location_name_to_id[name] for name in location_name_to_location if name in location_name_to_id]
+    rng.shuffle(item_ids)
+    rng.shuffle(location_ids)
+
+    stream = [{"cmd": "Connected", "missing_locations": list(location_ids), "checked_locations": [], "slot_data": {}}]
+
+    for start in range(0, max(len(item_ids), len(location_ids)), batch):
+        received = item_ids[start:start + batch]
+        if received:
+            stream.append({"cmd": "ReceivedItems", "index": start, "items": [[item_id, 0, 1, 0] for item_id in received]})
+
+        checked = location_ids[start:start + batch]
+        if checked:
+            stream.append({"cmd": "RoomUpdate", "checked_locations": checked})
+
+    return stream
+
+
+def make_model() -> TrackerModel:
+    item_id_to_item = {item_name_to_id[name]: item for name, item in item_name_to_item.items() if name in item_name_to_id}
+    location_id_to_location = {
+        location_name_to_id[name]: location for name, location in location_name_to_location.items() if name in location_name_to_id
+    }
+
+    return TrackerModel(
+        lambda item_id: item_id_to_item.get(item_id, {}),
+        lambda location_id: location_id_to_location.get(location_id, {}),
+        lambda category: False,
+        lambda location_name: location_name_to_id.get(location_name)
+    )
+
+
+def replay(stream: list[dict]) -> dict:
+    """Replays the packets through a new model the way ManualContext does, including reading back what the view would redraw."""
+    model = make_model()
+    packet_seconds = {}
+
+    start = time.perf_counter()
+    for packet in stream:
+        packet_start = time.perf_counter()
+
+        changes = model.on_package(packet["cmd"], packet)
+        if changes.rebuilt:
+            model.build(item_name_to_item.values(), {"name": "__Manual Game Complete__"})
+            changes.item_categories.update(model.item_categories.keys())
+            changes.location_categories.update(model.location_categories.keys())
+
+        # what the view reads back to redraw the changed parts
+        for category in changes.item_categories:
+            model.get_item_category_count(category)
+        for category in changes.location_categories:
+            model.get_location_category_counts(category)
+
+        packet_seconds.setdefault(packet["cmd"], []).append(time.perf_counter() - packet_start)
+
+    return {
+        "total_seconds": time.perf_counter() - start,
+        "packets": {
+            cmd: {"count": len(seconds), "total_seconds": sum(seconds), "max_seconds": max(seconds)}
+                for cmd, seconds in packet_seconds.items()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Manual client's tracker model against a stream of server packets.")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 25], help="Items received (and locations checked) per packet, for generated streams.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Replays per stream; the best total time is kept.")
+    parser.add_argument("--stream", default=None, help="A file of recorded packets (one JSON packet per line) to replay instead.")
+    parser.add_argument("--save-stream", default=None, help="Write the generated stream (of the first --batch) to this file.")
+    parser.add_argument("--output", default="client_tracker.json", help="Where to write the JSON results.")
+    args = parser.parse_args()
+
+    streams = {}
+    if args.stream:
+        with open(args.stream, encoding="utf-8") as stream_file:
+            streams[args.stream] = [json.loads(line) for line in stream_file if line.strip()]
+    else:
+        for batch in args.batch:
+            streams[f"batch {batch}"] = make_stream(batch, args.seed)
+
+        if args.save_stream:
+            with open(args.save_stream, "w", encoding="utf-8") as stream_file:
+                stream_file.writelines(json.dumps(packet) + "\n" for packet in streams[f"batch {args.batch[0]}"])
+
+    report = {
+        "benchmark": "client_tracker",
+        "game": game_name,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {"seed": args.seed, "repeat": args.repeat},
+        "results": {}
+    }
+
+    for name, stream in streams.items():
+        best = min((replay(stream) for _ in range(args.repeat)), key=lambda result: result["total_seconds"])
+        report["results"][name] = best
+
+        print(f"{name}: {len(stream)} packets in {best['total_seconds']:.4f}s")
+        for cmd, result in best["packets"].items():
+            print(f"    {cmd}: {result['count']} packets, {result['total_seconds']:.4f}s total, {result['max_seconds'] * 1000:.3f}ms slowest")
+
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Times the data import pipeline (the Data.py hooks, Data.py, Items.py and Locations.py) against generated packs.
+
+Run it from the root of an Archipelago source checkout that has this apworld unpacked in worlds/, e.g.:
+
+    python -m worlds.manual_pokemontcgages_fuzzy.benchmarks.data_pipeline --cards 1000 10000 50000 --output data_pipeline.json
+
+Results are written as JSON (sorted keys, one entry per card count) so two runs can be diffed,
+and --compare prints the change per stage against an earlier results file.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from io import StringIO
+from unittest.mock import patch
+
+from .synthetic_packs import generate_packs
+from .. import Data, Items, Locations
+from ..DataValidation import DataValidation
+from ..hooks import Data as DataHooks
+from ..hooks import functions
+
+# each stage is run in this order, since the module reloads depend on the ones before them
+#   (Items.py and Locations.py process the tables that Data.py just loaded)
+STAGES = [
+    ("after_load_item_file", lambda: DataHooks.after_load_item_file([])),
+    ("after_load_location_file", lambda: DataHooks.after_load_location_file([])),
+    ("after_load_region_file", lambda: DataHooks.after_load_region_file({})),
+    ("after_load_category_file", lambda: DataHooks.after_load_category_file({})),
+    ("Data.py", lambda: importlib.reload(Data)),
+    ("Items.py", lambda: importlib.reload(Items)),
+    ("Locations.py", lambda: importlib.reload(Locations)),
+]
+
+
+def read_csv_file_from(directory: str):
+    """Returns a stand-in for functions.get_csv_file that reads the generated packs in directory instead of the apworld's data.
+    A missing file raises, so a generated pack that's missing a file can't quietly be timed as an empty table."""
+    def get_csv_file(*args) -> StringIO:
+        with open(os.path.join(directory, *args), encoding="utf-8") as opened_file:
+            return StringIO(opened_file.read())
+
+    return get_csv_file
+
+
+def patch_pipeline(directory: str) -> ExitStack:
+    """Points the data hooks at the generated packs, and puts back everything the pipeline stages replace when it's closed:
+    the module tables that the Data/Items/Locations reloads rebind, the tables Data.py hands to DataValidation,
+    and the HP region percentages that after_load_region_file refills.\n
+    The modules' own dicts are restored (instead of reloading them again), so anything that kept a reference to
+    the original tables or classes, like ManualWorld, still matches the modules afterwards."""
+    stack = ExitStack()
+    stack.enter_context(patch.object(functions, "get_csv_file", read_csv_file_from(directory)))
+
+    for module in (Data, Items, Locations):
+        stack.enter_context(patch.dict(vars(module)))
+
+    stack.enter_context(patch.dict(DataHooks.hp_region_percentages))
+
+    validation_tables = ("game_table", "item_table", "location_table", "region_table", "category_table", "lookups")
+    stack.enter_context(patch.multiple(DataValidation, **{name: getattr(DataValidation, name) for name in validation_tables}))
+
+    return stack
+
+
+def run_pipeline(repeat: int) -> dict:
+    """Returns the best time (in seconds) and the peak traced memory (in bytes) of each stage."""
+    results = {name: {"seconds": None, "peak_bytes": None} for name, _ in STAGES}
+
+    # timing runs happen without tracemalloc, since tracing slows everything down a lot
+    for _ in range(repeat):
+        for name, stage in STAGES:
+            start = time.perf_counter()
+            stage()
+            elapsed = time.perf_counter() - start
+
+            if results[name]["seconds"] is None or elapsed < results[name]["seconds"]:
+                results[name]["seconds"] = elapsed
+
+    tracemalloc.start()
+    try:
+        for name, stage in STAGES:
+            tracemalloc.reset_peak()
+            stage()
+            results[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return results
+
+
+def run(args) -> dict:
+    report = {
+        "benchmark": "data_pipeline",
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {
+            "sets": args.sets,
+            "packs": args.packs,
+            "hp_min": args.hp_min,
+            "hp_max": args.hp_max,
+            "hp_step": args.hp_step,
+            "evolution_density": args.evolution_density,
+            "seed": args.seed,
+            "repeat": args.repeat
+        },
+        "results": {}
+    }
+
+    for card_count in args.cards:
+        with tempfile.TemporaryDirectory() as directory:
+            generate_packs(directory, card_count, set_count=args.sets, pack_count=args.packs,
+                           hp_min=args.hp_min, hp_max=args.hp_max, hp_step=args.hp_step,
+                           evolution_density=args.evolution_density, seed=args.seed)
+
+            # everything the stages replace is put back when this block ends, even if a stage fails
+            with patch_pipeline(directory):
+                stages = run_pipeline(args.repeat)
+
+                report["results"][str(card_count)] = {
+                    "stages": stages,
+                    "total_seconds": sum(stage["seconds"] for stage in stages.values()),
+                    "items": len(Items.item_name_to_item),
+                    "locations": len(Locations.location_name_to_location),
+                    "regions": len(Data.region_table),
+                    "categories": len(Data.category_table)
+                }
+
+            print(f"{card_count} cards: {report['results'][str(card_count)]['total_seconds']:.3f}s total")
+            for name, stage in stages.items():
+                print(f"    {name}: {stage['seconds']:.4f}s, peak {stage['peak_bytes'] / 1024 / 1024:.1f} MiB")
+
+    return report
+
+
+def compare(report: dict, previous: dict):
+    for card_count, result in report["results"].items():
+        previous_result = previous.get("results", {}).get(card_count)
+        if not previous_result:
+            continue
+
+        print(f"{card_count} cards compared to the previous results:")
+        for name, stage in result["stages"].items():
+            previous_stage = previous_result["stages"].get(name)
+            if not previous_stage or not previous_stage["seconds"]:
+                continue
+
+            change = (stage["seconds"] - previous_stage["seconds"]) / previous_stage["seconds"] * 100
+            print(f"    {name}: {previous_stage['seconds']:.4f}s -> {stage['seconds']:.4f}s ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Pokemon TCG: Ages data pipeline against generated packs.")
+    parser.add_argument("--cards", type=int, nargs="+", default=[1000, 10000, 50000], help="Card counts to generate packs for.")
+    parser.add_argument("--sets", type=int, default=20, help="Number of set names to spread the cards over.")
+    parser.add_argument("--packs", type=int, default=4, help="Number of pack folders to split the cards between.")
+    parser.add_argument("--hp-min", type=int, default=30)
+    parser.add_argument("--hp-max", type=int, default=240)
+    parser.add_argument("--hp-step", type=int, default=10)
+    parser.add_argument("--evolution-density", type=float, default=0.3, help="Share of Pokemon cards that get a pre-evolution.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per card count; the best run is kept.")
+    parser.add_argument("--output", default="data_pipeline.json", help="Where to write the JSON results.")
+    parser.add_argument("--compare", default=None, help="An earlier results file to compare against.")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous_file:
+            compare(report, json.load(previous_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Times each generation stage for multiworlds made of N players of this game.
+
+Run it from the root of an Archipelago source checkout that has this apworld unpacked in worlds/, e.g.:
+
+    python -m worlds.manual_pokemontcgages_fuzzy.benchmarks.multiworld_fill --players 1 10 50 200 --output multiworld_fill.json
+
+Each player gets different packs, banned_cards, starting_pokemon_count and late_power_pokemon options (from --seed),
+so the numbers aren't just one set of options multiplied. Pass --thresholds with a file of per-stage limits to
+fail (exit code 1) when a stage gets slower than its limit, and --write-thresholds to make that file from a run.
+
+This is not a full Main.py generation: connect_entrances, start_inventory_from_pool, plando, item links, locality rules,
+the spoiler playthrough and write_multidata are all skipped (see benchmarks/README.md).
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from argparse import Namespace
+
+from BaseClasses import MultiWorld, CollectionState
+from Fill import distribute_items_restrictive, balance_multiworld_progression
+from worlds.AutoWorld import AutoWorldRegister, call_all
+
+from ..Game import game_name
+from ..hooks.functions import get_pack_names, get_cards
+
+# the AP stages we time, in the order that Main.py runs them
+STAGES = [
+    "generate_early",
+    "create_regions",
+    "create_items",
+    "set_rules",
+    "generate_basic",
+    "pre_fill",
+    "fill",
+    "balance_progression",
+    "post_fill",
+    "fill_slot_data",
+    "generate_output",
+]
+
+
+def get_player_options(rng: random.Random) -> dict:
+    """Pick a random (but valid) set of this game's options for one player."""
+    optional_packs = [pack for pack in get_pack_names() if pack != '_default']
+    card_names = [
+        f"{card['Card Name']} {card['Set Name']} {card['Set Number']}"
+            for pack in get_pack_names() for card in get_cards(pack)
+    ]
+
+    return {
+        "packs": rng.sample(optional_packs, rng.randint(0, len(optional_packs))),
+        "banned_cards": rng.sample(card_names, min(len(card_names), rng.randint(0, 5))),
+        "starting_pokemon_count": rng.randint(1, 5),
+        "late_power_pokemon": rng.choice([True, False]),
+    }
+
+
+def create_multiworld(players: int, seed: int) -> MultiWorld:
+    world_type = AutoWorldRegister.world_types[game_name]
+    rng = random.Random(seed)
+
+    multiworld = MultiWorld(players)
+    multiworld.game = {player: game_name for player in range(1, players + 1)}
+    multiworld.player_name = {player: f"Bench{player}" for player in multiworld.player_ids}
+    multiworld.seed_name = f"benchmark{seed}"
+    multiworld.set_seed(seed)
+    multiworld.state = CollectionState(multiworld)
+
+    args = Namespace()
+    for player in multiworld.player_ids:
+        player_options = get_player_options(rng)
+
+        for key, option in world_type.options_dataclass.type_hints.items():
+            values = getattr(args, key, {})
+            values[player] = option.from_any(player_options.get(key, option.default))
+            setattr(args, key, values)
+
+    multiworld.set_options(args)
+
+    return multiworld
+
+
+def run_generation(players: int, seed: int) -> dict:
+    """Generates a multiworld of 'players' players and returns the seconds each stage took."""
+    timings = {}
+    multiworld = create_multiworld(players, seed)
+
+    def timed(stage: str, func, *args):
+        start = time.perf_counter()
+        func(*args)
+        timings[stage] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as output_directory:
+        for stage in STAGES:
+            if stage == "fill":
+                timed(stage, distribute_items_restrictive, multiworld)
+            elif stage == "balance_progression":
+                timed(stage, balance_multiworld_progression, multiworld)
+            elif stage == "fill_slot_data":
+                timed(stage, lambda: [multiworld.worlds[player].fill_slot_data() for player in multiworld.player_ids])
+            elif stage == "generate_output":
+                timed(stage, call_all, multiworld, stage, output_directory)
+            else:
+                timed(stage, call_all, multiworld, stage)
+
+    return timings
+
+
+def check_thresholds(report: dict, thresholds: dict) -> list[str]:
+    failures = []
+
+    for players, result in report["results"].items():
+        for stage, limit in thresholds.get(players, {}).items():
+            seconds = result["stages"].get(stage)
+            if seconds is not None and seconds > limit:
+                failures.append(f"{players} players, {stage}: {seconds:.3f}s is over the {limit:.3f}s threshold")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generation of multiworlds made of Pokemon TCG: Ages players.")
+    parser.add_argument("--players", type=int, nargs="+", default=[1, 10, 50, 200], help="Player counts to generate.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Generations of the same --seed per player count; the median time per stage is kept.")
+    parser.add_argument("--output", default="multiworld_fill.json", help="Where to write the JSON results.")
+    parser.add_argument("--thresholds", default=None, help="JSON file of {players: {stage: max seconds}} to check against.")
+    parser.add_argument("--write-thresholds", default=None, help="Write thresholds from this run (with --margin) to this file.")
+    parser.add_argument("--margin", type=float, default=1.5, help="Multiplier applied to this run's times by --write-thresholds.")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "multiworld_fill",
+        "game": game_name,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {"seed": args.seed, "repeat": args.repeat},
+        "results": {}
+    }
+
+    for players in args.players:
+        # every repeat generates the same multiworld, so the runs only differ by timing noise and can be compared between versions
+        runs = [run_generation(players, args.seed) for _ in range(args.repeat)]
+        median = {stage: statistics.median(run[stage] for run in runs) for stage in STAGES}
+
+        report["results"][str(players)] = {
+            "stages": median,
+            "total_seconds": sum(median.values()),
+            "runs": runs
+        }
+
+        print(f"{players} players: {report['results'][str(players)]['total_seconds']:.3f}s total (median of {args.repeat})")
+        for stage in STAGES:
+            print(f"    {stage}: {median[stage]:.4f}s")
+
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2, sort_keys=True)
+
+    if args.write_thresholds:
+        thresholds = {
+            players: {stage: seconds * args.margin for stage, seconds in result["stages"].items()}
+                for players, result in report["results"].items()
+        }
+        with open(args.write_thresholds, "w", encoding="utf-8") as thresholds_file:
+            json.dump(thresholds, thresholds_file, indent=2, sort_keys=True)
+
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as thresholds_file:
+            failures = check_thresholds(report, json.load(thresholds_file))
+
+        if failures:
+            print("Regressions found:\n" + "\n".join(f" - {failure}" for failure in failures))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import csv
+import os
+import random
+
+# generates pack folders shaped like the ones in data/ (pack_list.csv + one folder per pack with the 4 CSVs),
+#   so the data hooks can be run against a lot more cards than the bundled packs have
+
+CARD_LIST_FIELDS = ["Card Name", "Card Type", "Set Name", "Set Number", "HP", "Card Image URL"]
+ENEMY_FIELDS = ["Card Name", "Set Name", "Set Number", "HP", "Card Image URL"]
+EVOLUTION_FIELDS = ["Final Card Name", "Final Set Name", "Final Set Number",
+                    "Evolution Card Name", "Evolution Set Name", "Evolution Set Number", "Card Image URL"]
+
+POKEMON_TYPES = ["Colorless", "Dark", "Dragon", "Fairy", "Fighting", "Fire", "Grass", "Lightning", "Metal", "Psychic", "Water"]
+POKEMON_KINDS = ["Pokemon", "Pokemon EX"]
+TRAINER_TYPES = [
+    "Supporter - Draw", "Supporter - Search", "Supporter - Energy Acceleration",
+    "Trainer - Search", "Trainer - Recovery", "Trainer - Movement", "Trainer - Ace Spec",
+    "Stadium", "Tool", "Special Energy"
+]
+BASIC_ENERGY = ["Grass Energy", "Fire Energy", "Water Energy", "Lightning Energy",
+                "Psychic Energy", "Fighting Energy", "Darkness Energy", "Metal Energy"]
+
+IMAGE_URL = "https://limitlesstcg.nyc3.digitaloceanspaces.com/tpci/{set_name}/{set_name}_{number:03d}_R_EN.png"
+
+
+def generate_packs(directory: str, card_count: int, set_count: int = 10, pack_count: int = 1,
+                   hp_min: int = 30, hp_max: int = 240, hp_step: int = 10,
+                   pokemon_ratio: float = 0.6, evolution_density: float = 0.3, seed: int = 0) -> list[str]:
+    """Writes pack_list.csv and pack_count pack folders with card_count cards between them into directory.\n
+    HP values are spread evenly between hp_min and hp_max (in steps of hp_step) for the Pokemon cards,
+    and evolution_density is the share of Pokemon cards that get a pre-evolution listed.\n
+    Returns the generated pack names.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    hp_values = list(range(hp_min, hp_max + 1, hp_step))
+    set_names = [f"SY{index:02d}" for index in range(set_count)]
+    pack_names = [f"synthetic_{index + 1}" for index in range(pack_count)]
+
+    with open(os.path.join(directory, "pack_list.csv"), "w", newline="", encoding="utf-8") as pack_file:
+        writer = csv.writer(pack_file)
+        writer.writerow(["Pack Directory", "Pack Description"])
+        for pack_name in pack_names:
+            writer.writerow([pack_name, f"Synthetic Pack {pack_name}"])
+
+    set_numbers = {set_name: 0 for set_name in set_names}
+
+    for pack_index, pack_name in enumerate(pack_names):
+        # split the cards as evenly as possible between packs
+        pack_card_count = card_count // pack_count + (1 if pack_index < card_count % pack_count else 0)
+        cards = []
+        evolutions = []
+
+        for _ in range(pack_card_count):
+            set_name = rng.choice(set_names)
+            set_numbers[set_name] += 1
+            number = set_numbers[set_name]
+
+            if rng.random() < pokemon_ratio:
+                card_type = f"{rng.choice(POKEMON_KINDS)} - {rng.choice(POKEMON_TYPES)}"
+                hp = rng.choice(hp_values)
+                card_name = f"Synthmon {set_name}{number}" + (" EX" if card_type.startswith("Pokemon EX") else "")
+            else:
+                card_type = rng.choice(TRAINER_TYPES)
+                hp = 0
+                card_name = f"Synthetic {card_type.split(' - ')[0]} {set_name}{number}"
+
+            cards.append({
+                "Card Name": card_name,
+                "Card Type": card_type,
+                "Set Name": set_name,
+                "Set Number": number,
+                "HP": hp,
+                "Card Image URL": IMAGE_URL.format(set_name=set_name, number=number)
+            })
+
+            if hp and rng.random() < evolution_density:
+                evo_set_name = rng.choice(set_names)
+                set_numbers[evo_set_name] += 1
+                evo_number = set_numbers[evo_set_name]
+
+                evolutions.append({
+                    "Final Card Name": card_name,
+                    "Final Set Name": set_name,
+                    "Final Set Number": number,
+                    "Evolution Card Name": f"Presynth {evo_set_name}{evo_number}",
+                    "Evolution Set Name": evo_set_name,
+                    "Evolution Set Number": evo_number,
+                    "Card Image URL": IMAGE_URL.format(set_name=evo_set_name, number=evo_number)
+                })
+
+        # one static enemy for every HP value used in the pack
+        enemies = [
+            {
+                "Card Name": f"Synthenemy {hp}",
+                "Set Name": "SYE",
+                "Set Number": hp,
+                "HP": hp,
+                "Card Image URL": IMAGE_URL.format(set_name="SYE", number=hp)
+            }
+            for hp in sorted(set(card["HP"] for card in cards if card["HP"]))
+        ]
+
+        pack_directory = os.path.join(directory, pack_name)
+        os.makedirs(pack_directory, exist_ok=True)
+
+        _write_csv(os.path.join(pack_directory, "card_list.csv"), CARD_LIST_FIELDS, cards)
+        _write_csv(os.path.join(pack_directory, "enemies.csv"), ENEMY_FIELDS, enemies)
+        _write_csv(os.path.join(pack_directory, "evolutions_list.csv"), EVOLUTION_FIELDS, evolutions)
+        _write_csv(os.path.join(pack_directory, "energy_list.csv"), ["Energy Card Name"],
+                   [{"Energy Card Name": energy} for energy in BASIC_ENERGY])
+
+    return pack_names
+
+
+def _write_csv(path: str, fields: list[str], rows: list[dict]):
+    with open(path, "w", newline="", encoding="utf-8") as opened_file:
+        writer = csv.DictWriter(opened_file, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
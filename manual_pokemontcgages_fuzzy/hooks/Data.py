@@ -5,6 +5,10 @@ from worlds.AutoWorld import World
 # added some convenience functions in here so we can access them from any hook files
 from .functions import get_pack_names, get_cards, get_hp_distribution, get_hp_distribution_percentages, show_output
 
+# region name -> the card percentage that "X HP" region's requires ask for, filled in by after_load_region_file below
+#   so the HP ladder in hooks/World.py can use the same numbers without reading them back out of the requires strings
+hp_region_percentages = {}
+
 # called after the game.json file has been loaded
 def after_load_game_file(game_table: dict) -> dict:
     """
@@ -138,6 +142,7 @@ def after_load_region_file(region_table: dict) -> dict:
     """
 
     region_table = {}
+    hp_region_percentages.clear()
 
     for pack in get_pack_names():
         for hp, perc in get_hp_distribution_percentages(pack).items():
@@ -154,6 +159,10 @@ def after_load_region_file(region_table: dict) -> dict:
             # anything below 60 HP is the "intro" locations, 
             #   which you should be able to beat without hardly any received cards
             if hp >= 60:
+                # the requires only have 2 decimal places (see below), so keep the percentage they actually ask for
+                perc = float("%.2f" % (perc))
+                hp_region_percentages[region_name] = perc
+
                 # fancy way of making your requires a list and then joining them with the word " AND " between them
                 #   also, the %X % () syntax is an alternate way of formatting Python strings (use %s for strings),
                 #     and the %.Df part specifically formats numbers to D decimal places
@@ -12,7 +12,7 @@ from ..Locations import ManualLocation
 from ..Data import game_table, item_table, location_table, region_table
 
 # These helper methods allow you to determine if an option has been set, or what its value is, for any player in the multiworld
-from ..Helpers import is_option_enabled, get_option_value
+from ..Helpers import is_option_enabled, get_option_value, PoolSelection, LockedPlacements
 
 # calling logging.info("message") anywhere below in this file will output the message to both console and log file
 import logging
@@ -20,7 +20,8 @@ import re
 import math
 import json
 
-from .functions import get_pack_names, get_enemy_cards
+from .functions import PackSelection, HPLadder
+from .Data import hp_region_percentages
 
 ########################################################################################
 ## Order of method calls when the world generates:
@@ -35,6 +36,14 @@ from .functions import get_pack_names, get_enemy_cards
 ########################################################################################
 
 
+# Called once at the start of every generation (in ManualWorld.stage_assert_generate), before any player's world does anything.
+# If your hooks keep anything on a class or at module level between players, reset it here, so that generations
+#   in a long-running process (like the WebHost) don't keep adding to it or reuse data from the last generation
+def hook_reset_generation_caches(multiworld: MultiWorld):
+    # PackSelection shares what it works out from the packs between every player that picked the same ones (see functions.py)
+    PackSelection.clear_cache()
+
+
 # Use this function to change the valid filler items to be created to replace item links or starting items.
 # Default value is the `filler_item_name` from game.json
 def hook_get_filler_item_name(world: World, multiworld: MultiWorld, player: int) -> str | bool:
@@ -56,12 +65,8 @@ def before_create_regions(world: World, multiworld: MultiWorld, player: int):
     #   so we ensure that any option changes we make are accounted for in any other Manual/normal gen steps
 
     # so, first, let's figure out what packs were not included...
-    enabled_packs = world.options.packs.value
-    all_packs = get_pack_names()
-    packs_to_remove = [
-        p for p in all_packs 
-            if p != '_default' and p not in enabled_packs
-    ]
+    #   (PackSelection works this out once for every player that picked the same packs, see functions.py)
+    packs_to_remove = PackSelection.for_world(world).packs_to_remove
 
     # ... then, we just set the corresponding category option, which we defined in our Data.py hook
     for pack in packs_to_remove:
@@ -72,33 +77,27 @@ def before_create_regions(world: World, multiworld: MultiWorld, player: int):
         pack_option.value = False
 
 
-# Called after regions and locations are created, in case you want to see or modify that information. Victory location is included.
-def after_create_regions(world: World, multiworld: MultiWorld, player: int):
-    # here, we want to remove any locations that are associated with
+# Called for each region as it's created, with the names of the enabled locations that are about to be created in it.
+# Return the names of the locations that should actually be created. Anything left out is never created at all,
+#   which is a lot cheaper than creating locations and removing them from their regions in after_create_regions.
+def before_create_locations(location_names: list, region_name: str, world: World, multiworld: MultiWorld, player: int) -> list:
+    # here, we want to leave out any locations that are associated with
     #   card packs that weren't included in the packs to play
 
-    # so, first, let's figure out what packs were not included...
-    enabled_packs = world.options.packs.value
-    all_packs = get_pack_names()
-    packs_to_remove = [
-        p for p in all_packs 
-            if p != '_default' and p not in enabled_packs
+    # so, first, let's get the locations from the packs that were not included
+    #   (PackSelection works this out once for every player that picked the same packs, see functions.py)
+    location_names_to_remove = PackSelection.for_world(world).location_names_to_remove
+
+    # then, we only keep the locations that aren't in that set
+    return [
+        name for name in location_names if name not in location_names_to_remove
     ]
-    location_names_to_remove = []
 
-    # ... then, let's get a list of locations from those packs
-    for pack in packs_to_remove:
-        location_names_to_remove.extend([
-            name for name, l in world.location_name_to_location.items()
-                if pack in l.get('category', [])
-        ])
 
-    # finally, we loop over our regions and their locations, and remove
-    #   the ones that we identified
-    for region in multiworld.get_regions(player):
-        for location in region.get_locations():
-            if location.name in location_names_to_remove:
-                region.locations.remove(location)
+# Called after regions and locations are created, in case you want to see or modify that information. Victory location is included.
+def after_create_regions(world: World, multiworld: MultiWorld, player: int):
+    # locations from the packs that weren't included are never created, see before_create_locations above
+    pass
 
 
 # The item pool before starting items are processed, in case you want to see the raw item pool at that stage
@@ -108,39 +107,15 @@ def before_create_items_starting(item_pool: list, world: World, multiworld: Mult
     # also, after that, we want to remove any items that were banned
     #   via the banned_cards YAML option
 
-    # so, first, let's figure out what packs were not included...
-    enabled_packs = world.options.packs.value
-    all_packs = get_pack_names()
-    packs_to_remove = [
-        p for p in all_packs 
-            if p != '_default' and p not in enabled_packs
-    ]
-
-    item_names_to_remove = []
+    # so, first, let's get the items from the packs that were not included, plus the banned cards
+    #   (PackSelection works this out once for every player that picked the same packs and banned cards, see functions.py)
+    item_names_to_remove = PackSelection.for_world(world).item_names_to_remove
 
-    # ... then, let's get a list of items from those packs
-    for pack in packs_to_remove:
-        item_names_to_remove.extend([
-            name for name, i in world.item_name_to_item.items()
-                if pack in i.get('category', [])
-        ])
-
-    # finally, we set the item pool to be all of the items that don't have names in that list to remove
+    # finally, we set the item pool to be all of the items that don't have names in that set to remove
     item_pool = [
         i for i in item_pool if i.name not in item_names_to_remove
     ]
 
-    # now, for the banned cards, let's see if any were specified and, if so,
-    #   loop them and remove them from the item pool as well
-    if world.options.banned_cards.value:
-        for banned_card in world.options.banned_cards.value:
-            found_card = [
-                i for i in item_pool if i.name == banned_card
-            ]
-
-            for found in found_card:
-                item_pool.remove(found)
-
     # okay, all done modifying the pool, make sure to return it (even if you don't modify it!)
     return item_pool
 
@@ -178,6 +153,10 @@ def before_create_items_filler(item_pool: list, world: World, multiworld: MultiW
         }
     ]
 
+    # instead of removing each picked item from the pool as we go (which gets slow with big pools),
+    #   we let PoolSelection remember what was picked and then rebuild the pool once at the end
+    selection = PoolSelection(item_pool)
+
     for starting in starting_items:
         # get all items that have at least the category or categories we want
         possible_item_names = []
@@ -194,22 +173,16 @@ def before_create_items_filler(item_pool: list, world: World, multiworld: MultiW
         # remove any duplicate names from the list of possible items
         possible_item_names = set(possible_item_names)
 
-        # we add the list of items that have this specific category to our possible items
-        possible_items = [
-            i for i in item_pool 
-                if i.name in possible_item_names
-        ]
+        # we get the positions of the items in the pool that have this specific category
+        possible_items = selection.candidates(possible_item_names)
         
-        # pick a random possible item(s) to start with, then precollect them and,
-        #   since we just took them, remove them from the item pool
-        for _ in range(starting['random']): # loops from 0 to starting['random'] - 1
-            random_starting_item = world.random.choice(possible_items)
+        # pick a random possible item(s) to start with, then precollect them
+        #   (picking an item also means it won't be chosen again or left in the item pool)
+        for random_starting_item in selection.pick_choices(world.random, possible_items, starting['random']):
             multiworld.push_precollected(random_starting_item)
-            possible_items.remove(random_starting_item) # don't allow choosing the exact same item again
-            item_pool.remove(random_starting_item) # remove it from the pool since we're starting with it
 
-    # once we're done with everything, return our modified item pool
-    return item_pool
+    # once we're done with everything, return our modified item pool (minus the items we picked)
+    return selection.compact()
 
 
 # The complete item pool prior to being set for generation is provided here, in case you want to make changes to it
@@ -274,9 +247,12 @@ def after_set_rules(world: World, multiworld: MultiWorld, player: int):
     #   "loop item rows and loop their category field, then 
     #      return the categories in the category field"
     # think of it as "loop from the top down, return whatever at the front" for writing it out :)
+    #   (world.get_item_data() has this player's classifications from hook_get_item_classifications in it,
+    #     which the shared item_name_to_item table doesn't)
     item_categories = [
-        cat for i in world.item_name_to_item.values()
-            for cat in i.get('category', []) if i.get('progression') == True
+        cat for name, i in world.item_name_to_item.items()
+            if world.get_item_data(name).get('progression') == True
+                for cat in i.get('category', [])
     ]
     item_categories = list(set(item_categories)) # using a set removes duplicates, then we turn it back into a list
     item_categories = [cat for cat in item_categories if ' - ' in cat] # cheap way to filter for only complex categories (like "Trainer - Search")
@@ -323,37 +299,83 @@ def after_set_rules(world: World, multiworld: MultiWorld, player: int):
         #   see the victory location access_rule above
         multiworld.get_entrance(region_exit.name, player).access_rule = lambda state: True
 
+    #########################
 
-# The item name to create is provided before the item is created, in case you want to make changes to it
-def before_create_item(item_name: str, world: World, multiworld: MultiWorld, player: int) -> str:
-    
-    # here, we use the item's categories to figure out what classification 
+    # last, the "X HP" regions. their requires are all the same three percentage functions with a higher percentage
+    #   the higher the HP, so instead of Manual checking each region's requires separately (counting the same cards every time),
+    #   HPLadder works out the highest region a state can reach once, and every HP location and exit just compares against it
+    # (only the regions Data.py gave those requires to are on the ladder, so ones like the region we just changed are left alone)
+    hp_ladder = HPLadder(world, hp_region_percentages)
+    world.hp_ladder = hp_ladder # kept so the before_pre_fill hook below can freeze its totals
+
+    for region_name, rung in hp_ladder.region_rungs.items():
+        ladder_rule = lambda state, rung=rung: hp_ladder.get_highest_rung(state) >= rung
+        region = multiworld.get_region(region_name, player)
+
+        # the region's requires are checked on each of its locations too, so swap those out
+        #   (but not for locations that have requires of their own, since those are combined with the region's)
+        for location in region.locations:
+            if not world.location_name_to_location.get(location.name, {}).get('requires'):
+                location.access_rule = ladder_rule
+
+        for region_exit in region.exits:
+            region_exit.access_rule = ladder_rule
+
+
+# Called after an item is collected into a CollectionState, whether or not it changed anything, so you can update
+#   anything you've cached on the state. "changed" is what ManualWorld.collect returned (True if it was a progression item).
+def after_collect_item(world: World, state: CollectionState, changed: bool, item: ManualItem) -> None:
+    # the HP ladder keeps the highest HP region each player can reach on the state, so it has to be worked out again
+    if changed:
+        state.tcg_ages_hp_rungs.pop(item.player, None)
+
+
+# Same as above, but after an item is removed from a CollectionState.
+def after_remove_item(world: World, state: CollectionState, changed: bool, item: ManualItem) -> None:
+    if changed:
+        state.tcg_ages_hp_rungs.pop(item.player, None)
+
+
+# Called once per player, to get the key that their item classifications (see below) are cached under.
+# Players with the same key share the same classifications, so only include the options that change them.
+# Return None if the classifications don't depend on any options (like here), so they're only worked out once per generation.
+def hook_get_item_classification_key(world: World, multiworld: MultiWorld, player: int):
+    # if, say, a "make trainers progression" option changed classifications, you'd return its value here:
+    #   return world.options.make_trainers_progression.value
+    return None
+
+
+# Called once per distinct classification key (see above), to set classifications for this player's items
+#   without changing the shared item table. The returned dict is keyed by item name, and each value's keys
+#   replace the same keys from the item table when Manual creates that item (for this player and any player with the same key).
+# To remove a classification that's set in the item table, set it to False instead of leaving it out.
+def hook_get_item_classifications(item_classifications: dict, world: World, multiworld: MultiWorld, player: int) -> dict:
+    # here, we use the item's categories to figure out what classification
     #   it should be based on our game's design
-    # REMINDER: this updates all instances of the item, not just the one being created here
 
-    # cards that unlock evolutions, are tutor or draw supporters, 
+    # cards that unlock evolutions, are tutor or draw supporters,
     #   or are tutor items are progression
     progression_categories = ['Pokemon', 'Supporter - Search', 'Supporter - Draw', 'Trainer - Search']
-    
-    item_from_table = world.item_name_to_item.get(item_name)
 
-    # if the card's categories intersect at all with progression cats, it's progression
-    if set(item_from_table.get('category', [])).intersection(progression_categories):
-        item_from_table['progression'] = True
+    for item_name, item_from_table in world.item_name_to_item.items():
+        # if the card's categories intersect at all with progression cats, it's progression
+        if set(item_from_table.get('category', [])).intersection(progression_categories):
+            item_classifications[item_name] = {'progression': True}
 
-    # otherwise, the item is useful,
-    #   except if it's already been flagged as filler in the item table
-    elif not item_from_table.get('filler'):
-        item_from_table['useful'] = True
+        # otherwise, the item is useful,
+        #   except if it's already been flagged as filler in the item table
+        elif not item_from_table.get('filler'):
+            # and we turn off the classifications that would override useful,
+            #   if present on the item from the item table
+            item_classifications[item_name] = {'useful': True, 'progression': False, 'progression_skip_balancing': False}
+
+    return item_classifications
 
-        # remove the classifications that would override useful, 
-        #   if present on the item from the item table
-        for removing_classification in ['progression', 'progression_skip_balancing']:
-            if removing_classification in item_from_table.keys(): # you don't have to use .keys() here, but I like how verbose it is
-                del item_from_table[removing_classification]
-    else:
-        item_from_table['filler'] = True
 
+# The item name to create is provided before the item is created, in case you want to make changes to it
+def before_create_item(item_name: str, world: World, multiworld: MultiWorld, player: int) -> str:
+    # REMINDER: changing the item in world.item_name_to_item here would change it for every player, not just this one
+    #   to change an item's classification, use hook_get_item_classifications above instead
     return item_name
 
 
@@ -422,16 +444,12 @@ def before_generate_basic(world: World, multiworld: MultiWorld, player: int) ->
     # finally, loop over the "power" pokemon, pick locations at random, 
     #   and place the pokemon at the chosen location until there are no
     #   more "power" pokemon left
-    for pp in power_pokemon:
-        if len(available_locations) == 0: 
-            break
-
-        location_to_place_at = world.random.choice(available_locations)
-        location_to_place_at.place_locked_item(pp) # place the item at the location...
-        multiworld.itempool.remove(pp) # ... then remove it from the itempool since it doesn't need placing anymore
-
-        # and we already chose the location at random, so remove it from our list of available locs
-        available_locations.remove(location_to_place_at)
+    # LockedPlacements takes all of the placed pokemon out of the itempool at once when the "with" block ends,
+    #   since the itempool has every player's items in it and removing them one by one is slow
+    # it also remembers which locations it used, so each location is only picked once
+    #   (without removing each chosen location from available_locations, which is slow with many locations)
+    with LockedPlacements(multiworld) as placements:
+        placements.place_randomly(world.random, available_locations, power_pokemon)
 
 
 # This method is run at the very end of pre-generation, once the place_item options have been handled and before AP generation occurs
@@ -443,20 +461,10 @@ def after_generate_basic(world: World, multiworld: MultiWorld, player: int):
     #   then pass that list to our custom client
     # so we'll add that list to the world (keyed to this player), then put that list in slot data for the client
 
-    enabled_packs = world.options.packs.value
-    # seed the enemy list with the enemies in default so, if other packs are missing HPs,
-    #   we at least have a default enemy to take on
-    enemies = {
-        card['HP']: [f"{card['Card Name']} {card['Set Name']} {card['Set Number']}"]
-            for card in get_enemy_cards('_default')
-    }
-
-    for pack in get_pack_names():
-        if pack not in enabled_packs:
-            continue
-
-        for card in get_enemy_cards(pack):
-            enemies[card['HP']].append(f"{card['Card Name']} {card['Set Name']} {card['Set Number']}")
+    # the enemy list has the enemies in default (so, if other packs are missing HPs,
+    #   we at least have a default enemy to take on) and the enemies of every enabled pack
+    #   (PackSelection reads those from the CSVs once for every player that picked the same packs, see functions.py)
+    enemies = PackSelection.for_world(world).enemies
 
     # pick an enemy at random, for each HP amount, from the available options
     enemy_choices = {
@@ -470,6 +478,14 @@ def after_generate_basic(world: World, multiworld: MultiWorld, player: int):
     world.enemy_choices[player] = enemy_choices
 
 
+# This is called at the start of pre_fill, once the item pool is final (start_inventory_from_pool has been handled by then)
+#   and right before AP's fill starts checking rules over and over
+def before_pre_fill(world: World, multiworld: MultiWorld, player: int):
+    # the item pool won't change anymore, so the HP ladder (see after_set_rules) can stop counting it on every check
+    if hasattr(world, 'hp_ladder'):
+        world.hp_ladder.freeze_totals()
+
+
 # This is called before slot data is set and provides an empty dict ({}), in case you want to modify it before Manual does
 def before_fill_slot_data(slot_data: dict, world: World, multiworld: MultiWorld, player: int) -> dict:
     # in the after_generate_basic hook above, we figure out what our enemy list is
@@ -24,8 +24,13 @@ class ManualPokemonTCGAgesContext(ManualContext):
         )
         self.ui.base_title = client_name # set a custom title for the custom client window
 
-        self.last_deck_contents = []
         self.enemies = {}
+        self.deck_builder_dirty = False
+        # the Deck Builder tab is built once (in build_custom_ui), and these are the parts of it that change afterwards
+        self.deck_builder_built = False
+        self.received_card_picker = None
+        self.enemy_card_picker = None
+        self.received_cards_listed = 0 # how many of self.items_received are already in the received card picker
 
     def on_package(self, cmd: str, args: dict):
         super().on_package(cmd, args)
@@ -33,11 +38,52 @@ class ManualPokemonTCGAgesContext(ManualContext):
         if cmd in {"Connected"}:
             self.enemies = json.loads(args['slot_data'].get('enemies', "{}"))
 
-            self.update_custom_ui()
-        elif cmd in {"DataPackage", "ReceivedItems", "RoomUpdate"}:
+        # item names can change with a new DataPackage, so list every received card again
+        if cmd in {"Connected", "DataPackage"}:
+            self.received_cards_listed = 0
+
+        # updating the Deck Builder for every packet of a burst is slow, so it's just marked
+        #   and then updated once on the next frame (in refresh_ui below)
+        if cmd in {"Connected", "DataPackage", "ReceivedItems"}:
+            self.deck_builder_dirty = True
+            self.schedule_ui_refresh()
+
+    def refresh_ui(self):
+        super().refresh_ui()
+
+        if self.deck_builder_dirty:
+            self.deck_builder_dirty = False
             self.update_custom_ui()
 
     def update_custom_ui(self):
+        if not self.deck_builder_built:
+            self.build_custom_ui()
+            self.deck_builder_built = True
+
+        # the deck itself is left alone here, only the pickers get the cards and enemies that are new since last time
+        if self.received_cards_listed > len(self.items_received): # the server sent every item again
+            self.received_cards_listed = 0
+
+        new_cards = [
+            self.item_names.lookup_in_game(network_item.item) for network_item in self.items_received[self.received_cards_listed:]
+                if hasattr(network_item, "item") # skips the "__Victory__" that the Victory button adds
+        ]
+
+        if self.received_cards_listed == 0:
+            self.received_card_picker.values = new_cards
+        elif new_cards:
+            self.received_card_picker.add_values(new_cards)
+
+        self.received_cards_listed = len(self.items_received)
+
+        enemy_cards = [
+            f"{enemy_hp} HP: {enemy_card}" for enemy_hp, enemy_card in self.enemies.items()
+        ]
+
+        if self.enemy_card_picker.values != enemy_cards:
+            self.enemy_card_picker.values = enemy_cards
+
+    def build_custom_ui(self):
         from kivy.uix.modalview import ModalView
         from kivy.uix.scrollview import ScrollView
         from kivy.uix.gridlayout import GridLayout
@@ -51,6 +97,27 @@ class ManualPokemonTCGAgesContext(ManualContext):
         # Spinner means Dropdown, because Kivy. And Dropdown is a pita to use
         class CardSelect(Spinner): 
             background_color = [4/255, 121/255, 217/255, 1] # colors are rgba, so rgb (1-255) and an opacity
+            adding_values = False
+
+            # Spinner throws away and remakes every option in its dropdown whenever values changes (even for values.extend()),
+            #   so this adds values and makes options for only those, instead of for every received card each time
+            def add_values(self, new_values: list):
+                self.adding_values = True
+                try:
+                    self.values.extend(new_values)
+                finally:
+                    self.adding_values = False
+
+                for value in new_values:
+                    option = self.option_cls(text=value)
+                    if self.sync_height:
+                        option.height = self.height
+                    option.bind(on_release=lambda option: self._dropdown.select(option.text))
+                    self._dropdown.add_widget(option)
+
+            def _update_dropdown(self, *args):
+                if not self.adding_values: # add_values makes its own options
+                    super()._update_dropdown(*args)
 
         class EnergySelect(CardSelect): # extend CardSelect in case we add default behavior later
             background_color = [48/255, 138/255, 34/255, 1]
@@ -156,13 +223,11 @@ class ManualPokemonTCGAgesContext(ManualContext):
             update_total_quantity()
 
         def update_total_quantity():
-            self.last_deck_contents = []
             total = 0
 
             for _, child in enumerate(deck_contents.children):
                 for _, card_child in enumerate(child.children):
                     if type(card_child) is Label:
-                        self.last_deck_contents.append(card_child.text)
                         total += int(card_child.text.split(' ')[0].strip())
                         
             card_total.text = f"{total} Cards in Deck"
@@ -188,7 +253,6 @@ class ManualPokemonTCGAgesContext(ManualContext):
         def clear_contents():
             deck_contents.clear_widgets()
             update_total_quantity()
-            self.last_deck_contents = []
 
         deck_builder_layout = GridLayout(cols=2)
         card_picker_layout = BoxLayout(orientation="vertical", padding=(dp(20), dp(20), dp(20), dp(50))) # padding is (left, top, right, bottom)
@@ -204,12 +268,10 @@ class ManualPokemonTCGAgesContext(ManualContext):
         card_dropdown_label = Label(text="Received Card", size_hint_x=None, bold=True)
         received_cards_layout.add_widget(card_dropdown_label)
 
-        unlocked_cards = [
-            self.item_names.lookup_in_game(network_item.item) for network_item in self.items_received
-        ]
-
+        # starts empty, then update_custom_ui adds the received cards to it as they come in
         received_card_picker = CardSelect(text="(None Selected)", size_hint=(None, None), size=(dp(250), dp(30)), sync_height=True,
-            values=unlocked_cards, option_cls=CardSelectOption)
+            values=[], option_cls=CardSelectOption)
+        self.received_card_picker = received_card_picker
 
         card_dropdown_btn = Button(text="Add", size_hint=(None, None), size=(dp(50), dp(30)))
         card_dropdown_btn.bind(on_release=lambda _: add_card_to_contents(received_card_picker.text))
@@ -288,12 +350,10 @@ class ManualPokemonTCGAgesContext(ManualContext):
         enemy_dropdown_label = Label(text="Enemies by HP", size=(dp(110), dp(30)), size_hint_y=None, size_hint_x=None, bold=True)
         enemy_cards_layout.add_widget(enemy_dropdown_label)
 
-        enemy_cards = [
-            f"{enemy_hp} HP: {enemy_card}" for enemy_hp, enemy_card in self.enemies.items()
-        ]
-        
+        # update_custom_ui fills this in, and again whenever the enemies change on Connected
         enemy_card_picker = EnemySelect(text="(None Selected)", size_hint=(None, None), size=(dp(250), dp(30)), sync_height=True,
-            values=enemy_cards, option_cls=CardSelectOption)
+            values=[], option_cls=CardSelectOption)
+        self.enemy_card_picker = enemy_card_picker
 
         enemy_dropdown_btn = Button(text="Copy Decklist", size_hint=(None, None), size=(dp(150), dp(30)))
         enemy_dropdown_btn.bind(on_release=lambda _: copy_enemy_decklist(enemy_card_picker.text))
@@ -343,20 +403,9 @@ class ManualPokemonTCGAgesContext(ManualContext):
                 child.background_color = [117/255, 177/255, 240/255, 1]
                 panel = child # instead of creating a new TabbedPanelItem, use the one we use above to make the tabs show
 
+        # this is built once and kept, so the deck stays as it is while checks are sent and items come in
         panel.content = deck_builder_layout
 
-        # now, check for a pre-existing deck and restore it (since it's cleared when a check is sent)
-        if len(self.last_deck_contents) > 0:
-            reversed_deck_contents = [card for card in self.last_deck_contents] # copies the list
-            reversed_deck_contents.reverse()
-
-            for deck_listing in reversed_deck_contents:
-                qty = int(deck_listing.split(" ")[0].strip())
-                card_name = " ".join(deck_listing.split(" ")[1:]).strip()
-
-                for _ in range(qty):
-                    add_card_to_contents(card_name)
-
 #######################################################
 ########### End of *ManualContext class ###############
 #######################################################
@@ -4,11 +4,14 @@ import os
 import pkgutil
 import csv
 import re
+import math
 
+from bisect import bisect_left
 from io import StringIO
 
 from Utils import local_path
-from worlds.AutoWorld import World
+from BaseClasses import CollectionState
+from worlds.AutoWorld import World, LogicMixin
 
 
 ###
@@ -177,10 +180,7 @@ def get_hp_distribution_percentages(pack_name: str) -> dict:
     return hp_distribution_percentages
 
 def get_itempool_total_by_category(world: World, category_name: str) -> int:
-    item_names = [
-        i['name'] for i in world.item_name_to_item.values() 
-            if category_name in i.get('category', [])
-    ]
+    item_names = PackSelection.for_world(world).get_category_item_names(category_name)
 
     return len([
         i for i in world.multiworld.itempool 
@@ -188,6 +188,184 @@ def get_itempool_total_by_category(world: World, category_name: str) -> int:
     ])
 
 
+###
+# Pack selection functions
+###
+
+class PackSelection:
+    """Everything we work out from a player's enabled packs and banned cards during generation.\n
+    Most players pick the same few pack combinations, so this is made once per combination
+    and shared by every player that picked it. Use PackSelection.for_world(world) to get one.
+    """
+    cache: dict = {}
+
+    @classmethod
+    def for_world(cls, world: World) -> "PackSelection":
+        key = (frozenset(world.options.packs.value), frozenset(world.options.banned_cards.value))
+
+        if key not in cls.cache:
+            cls.cache[key] = cls(world, *key)
+
+        return cls.cache[key]
+
+    @classmethod
+    def clear_cache(cls):
+        """Forgets every pack selection, so a new generation (maybe with reloaded data) doesn't reuse the last one's."""
+        cls.cache = {}
+
+    def __init__(self, world: World, enabled_packs: frozenset, banned_cards: frozenset):
+        self.enabled_packs = enabled_packs
+        self.banned_cards = banned_cards
+
+        # every pack that's not the default pack and wasn't included in the packs to play
+        self.packs_to_remove = [
+            p for p in get_pack_names()
+                if p != '_default' and p not in enabled_packs
+        ]
+        removed_packs = set(self.packs_to_remove)
+
+        # the items and locations from the removed packs (plus the banned cards, for items)
+        self.item_names_to_remove = {
+            name for name, i in world.item_name_to_item.items()
+                if removed_packs.intersection(i.get('category', []))
+        } | banned_cards
+        self.location_names_to_remove = {
+            name for name, l in world.location_name_to_location.items()
+                if removed_packs.intersection(l.get('category', []))
+        }
+
+        # the possible enemies for each HP amount, from the default pack and the enabled packs
+        self.enemies = {}
+        for pack in get_pack_names():
+            if pack != '_default' and pack not in enabled_packs:
+                continue
+
+            for card in get_enemy_cards(pack):
+                self.enemies.setdefault(card['HP'], []).append(f"{card['Card Name']} {card['Set Name']} {card['Set Number']}")
+
+        self.item_name_to_item = world.item_name_to_item
+        self.category_item_names = {}
+
+    def get_category_item_names(self, category_name: str) -> set:
+        """The names of the items in the category that weren't removed by this pack selection."""
+        if category_name not in self.category_item_names:
+            self.category_item_names[category_name] = {
+                name for name, i in self.item_name_to_item.items()
+                    if category_name in i.get('category', []) and name not in self.item_names_to_remove
+            }
+
+        return self.category_item_names[category_name]
+
+
+###
+# HP ladder functions
+###
+
+class HPLadderState(LogicMixin):
+    # AP adds these to every CollectionState. this keeps the highest HP ladder rung each player has unlocked in that state,
+    #   as player -> (item pool totals, rung), and gets cleared by the after_collect_item/after_remove_item hooks
+    tcg_ages_hp_rungs: dict
+
+    def init_mixin(self, multiworld) -> None:
+        self.tcg_ages_hp_rungs = {}
+
+    def copy_mixin(self, new_state: CollectionState) -> CollectionState:
+        new_state.tcg_ages_hp_rungs = self.tcg_ages_hp_rungs.copy()
+        return new_state
+
+
+class HPLadder:
+    """The "X HP" regions all require the same three percentage functions from Rules.py (see after_load_region_file in Data.py),
+    and a higher percentage can never be easier to meet than a lower one. So the regions are rungs of a ladder, sorted by percentage,
+    and a state can reach every rung up to the highest one it meets.\n
+    The percentages are the ones Data.py wrote the requires with (hp_region_percentages there), passed in as region name -> percentage.\n
+    This finds that highest rung with a binary search on the state's three card counts, and keeps it on the state
+    until the player's items change, so checking any number of HP locations and regions is one lookup per state.\n
+    It mirrors hasPercentageKeySupporters, hasPercentageKeyTrainers and hasPercentagePokemon in hooks/Rules.py,
+    so any change to those functions has to be made here too.
+    """
+    def __init__(self, world: World, region_percentages: dict):
+        self.world = world
+        self.player = world.player
+
+        # the distinct percentages, lowest first, and which of them each region needs
+        self.percentages = sorted(set(region_percentages.values()))
+        self.region_rungs = {
+            region_name: bisect_left(self.percentages, percentage)
+                for region_name, percentage in region_percentages.items()
+        }
+
+        # the same card lists that the requirement functions in Rules.py check the state against
+        self.key_supporter_names = [
+            i['name'] for i in world.item_name_to_item.values()
+                if "Supporter - Draw" in i.get("category", []) or "Supporter - Search" in i.get("category", [])
+        ]
+        self.key_trainer_names = [
+            i['name'] for i in world.item_name_to_item.values() if "Trainer - Search" in i.get("category", [])
+        ]
+        self.pokemon_names = [
+            i['name'] for i in world.item_name_to_item.values() if "Pokemon" in i.get("category", [])
+        ]
+
+        # the item pool totals that the percentages are taken from. they're counted again on every check (like Rules.py does)
+        #   until freeze_totals() is called in the before_pre_fill hook, since the item pool can still change before then
+        #   (like start_inventory_from_pool swapping the pulled cards for filler after generate_basic)
+        self.totals = None
+
+    def count_totals(self) -> tuple:
+        return (
+            get_itempool_total_by_category(self.world, "Supporter - Draw") + get_itempool_total_by_category(self.world, "Supporter - Search"),
+            get_itempool_total_by_category(self.world, "Trainer - Search"),
+            get_itempool_total_by_category(self.world, "Pokemon")
+        )
+
+    def freeze_totals(self):
+        """Counts the item pool totals one last time and keeps them. Only call this once the item pool is final."""
+        self.totals = self.count_totals()
+
+    def get_totals(self) -> tuple:
+        return self.totals if self.totals is not None else self.count_totals()
+
+    def is_rung_met(self, percentage: float, counts: tuple, totals: tuple) -> bool:
+        key_supporters, key_trainers, pokemon = counts
+        total_key_supporters, total_key_trainers, total_pokemon = totals
+
+        # a category requirement on a category with no items is never met in Rules.py, so it isn't here either
+        return key_supporters >= math.floor(total_key_supporters * percentage) \
+            and len(self.key_trainer_names) > 0 and key_trainers >= math.floor(total_key_trainers * percentage) \
+            and len(self.pokemon_names) > 0 and pokemon >= math.floor(total_pokemon * percentage)
+
+    def get_highest_rung(self, state: CollectionState) -> int:
+        """The index of the highest rung the state meets, or -1 if it doesn't meet any."""
+        totals = self.get_totals()
+        cached = state.tcg_ages_hp_rungs.get(self.player)
+
+        # the rung is kept with the totals it was worked out from, so it's never used with different totals
+        if cached is not None and cached[0] == totals:
+            return cached[1]
+
+        counts = (
+            state.count_from_list_unique(self.key_supporter_names, self.player),
+            sum(state.count(name, self.player) for name in self.key_trainer_names),
+            sum(state.count(name, self.player) for name in self.pokemon_names)
+        )
+
+        # find the first rung that isn't met, since every rung above it isn't met either
+        low, high = 0, len(self.percentages)
+        while low < high:
+            middle = (low + high) // 2
+            if self.is_rung_met(self.percentages[middle], counts, totals):
+                low = middle + 1
+            else:
+                high = middle
+
+        state.tcg_ages_hp_rungs[self.player] = (totals, low - 1)
+        return low - 1
+
+    def can_reach(self, state: CollectionState, region_name: str) -> bool:
+        return self.get_highest_rung(state) >= self.region_rungs[region_name]
+
+
 ###
 # Options functions
 #
@@ -1,6 +1,222 @@
+import sys
+import unittest
+from collections import Counter
+from contextlib import ExitStack
+from random import Random
+from unittest.mock import patch
+
+from BaseClasses import CollectionState, Item, ItemClassification
 from test.TestBase import WorldTestBase
+from . import ManualWorld
 from .Game import game_name
+from .Helpers import PoolSelection
+from .hooks.Data import hp_region_percentages
 
 
 class ManualTest(WorldTestBase):
     game = game_name
+
+
+def make_items(names: list) -> list:
+    return [Item(name, ItemClassification.filler, None, 1) for name in names]
+
+
+class PoolSelectionTest(unittest.TestCase):
+    """PoolSelection has to pick the same items, and leave the same pool, as the old random + pool.remove() code for the same seed."""
+    names = ["Card A"] * 6 + ["Card B"] * 5 + ["Card C"] * 7 + ["Card D"] * 4 + ["Filler"] * 10
+
+    def test_pick_choices_same_as_choice_and_remove(self):
+        for seed in range(50):
+            with self.subTest(seed=seed):
+                pool = make_items(self.names)
+                possible_items = [item for item in pool if item.name in {"Card A", "Card C"}]
+                random = Random(seed)
+                old_picks = []
+                for _ in range(9):
+                    item = random.choice(possible_items)
+                    old_picks.append(item.name)
+                    possible_items.remove(item)
+                    pool.remove(item)
+
+                selection = PoolSelection(make_items(self.names))
+                random = Random(seed)
+                new_picks = selection.pick_choices(random, selection.candidates({"Card A", "Card C"}), 9)
+
+                self.assertEqual(old_picks, [item.name for item in new_picks])
+                self.assertEqual([item.name for item in pool], [item.name for item in selection.compact()])
+
+    def test_pick_shuffled_same_as_shuffle_and_remove(self):
+        # (item names or None for the whole pool, how many), alternating so the whole pool shuffles reorder later picks
+        picks = [(None, 5), ({"Card A", "Card B"}, 3), (None, 4), ({"Card C"}, 2), ({"Card A", "Card C", "Card D"}, 6)]
+
+        for seed in range(50):
+            with self.subTest(seed=seed):
+                pool = make_items(self.names)
+                random = Random(seed)
+                old_picks = []
+                for item_names, count in picks:
+                    items = pool if item_names is None else [item for item in pool if item.name in item_names]
+                    random.shuffle(items)
+                    for item in items[0:count]:
+                        old_picks.append(item.name)
+                        pool.remove(item)
+
+                selection = PoolSelection(make_items(self.names))
+                random = Random(seed)
+                new_picks = []
+                for item_names, count in picks:
+                    new_picks.extend(item.name for item in selection.pick_shuffled(random, item_names, count))
+
+                self.assertEqual(old_picks, new_picks)
+                self.assertEqual([item.name for item in pool], [item.name for item in selection.compact()])
+
+
+class StartingItemsTest(WorldTestBase):
+    """Runs ManualWorld.create_items with fixed starting_items blocks (and this world's before_create_items_filler hook),
+    and checks that they picked the same items, and left the same pool, as the old shuffle/choice + pool.remove() code would have."""
+    game = game_name
+
+    starting_items = [
+        {"random": 4},
+        {"item_categories": ["Pokemon"], "random": 3},
+        {"random": 2},
+        {"item_categories": ["Trainer - Search", "Supporter - Draw"], "random": 2},
+    ]
+
+    def setUp(self):
+        with self.patch_create_items():
+            super().setUp()
+
+    def patch_create_items(self) -> ExitStack:
+        """Patches the starting items blocks in, and records the pool and random state around both starting items steps."""
+        world_module = sys.modules[ManualWorld.__module__]
+        original_starting = world_module.before_create_items_starting
+        original_filler = world_module.before_create_items_filler
+        self.recorded = {}
+
+        def before_create_items_starting(item_pool, world, multiworld, player):
+            item_pool = original_starting(item_pool, world, multiworld, player)
+            self.recorded["starting"] = (list(item_pool), world.random.getstate())
+            return item_pool
+
+        def before_create_items_filler(item_pool, world, multiworld, player):
+            self.recorded["filler"] = (list(item_pool), world.random.getstate(), len(multiworld.precollected_items[player]))
+            item_pool = original_filler(item_pool, world, multiworld, player)
+            self.recorded["filler_result"] = (list(item_pool), [item.name for item in multiworld.precollected_items[player]])
+            return item_pool
+
+        stack = ExitStack()
+        stack.enter_context(patch.object(world_module, "starting_items", self.starting_items))
+        stack.enter_context(patch.object(world_module, "before_create_items_starting", before_create_items_starting))
+        stack.enter_context(patch.object(world_module, "before_create_items_filler", before_create_items_filler))
+        return stack
+
+    def category_item_names(self, categories: list) -> set:
+        world = self.multiworld.worlds[self.player]
+        return {name for name, item in world.item_name_to_item.items() if set(categories).intersection(item.get("category", []))}
+
+    def check_starting_items(self):
+        pool, random_state = self.recorded["starting"]
+        random = Random()
+        random.setstate(random_state)
+        started = []
+
+        for block in self.starting_items:
+            items = pool
+            if "item_categories" in block:
+                item_names = self.category_item_names(block["item_categories"])
+                items = [item for item in pool if item.name in item_names]
+            random.shuffle(items)
+            for item in items[0:block["random"]]:
+                started.append(item.name)
+                pool.remove(item)
+
+        filler_pool, _, _ = self.recorded["filler"]
+        self.assertEqual(Counter(started), Counter(self.multiworld.worlds[self.player].start_inventory))
+        self.assertEqual([item.name for item in pool], [item.name for item in filler_pool])
+
+    def check_filler_starting_items(self):
+        pool, random_state, precollected_before = self.recorded["filler"]
+        random = Random()
+        random.setstate(random_state)
+        started = []
+
+        # the same blocks that before_create_items_filler in hooks/World.py starts with
+        blocks = [
+            (["Supporter - Draw"], 1),
+            (["Trainer - Search"], 1),
+            (["Pokemon"], self.multiworld.worlds[self.player].options.starting_pokemon_count.value),
+        ]
+        for categories, count in blocks:
+            item_names = self.category_item_names(categories)
+            possible_items = [item for item in pool if item.name in item_names]
+            for _ in range(count):
+                item = random.choice(possible_items)
+                started.append(item.name)
+                possible_items.remove(item)
+                pool.remove(item)
+
+        result_pool, precollected = self.recorded["filler_result"]
+        self.assertEqual(started, precollected[precollected_before:])
+        self.assertEqual([item.name for item in pool], [item.name for item in result_pool])
+
+    def test_same_starting_items_as_remove(self):
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                with self.patch_create_items():
+                    self.world_setup(seed)
+                self.check_starting_items()
+                self.check_filler_starting_items()
+
+
+
+class HPLadderTest(WorldTestBase):
+    """The HP ladder rules that after_set_rules in hooks/World.py puts on the "X HP" locations and exits
+    have to agree with the Rules.py requires rules they replace, for any items the player has collected."""
+    game = game_name
+    checks_per_order = 10
+
+    def setUp(self):
+        with self.patch_set_rules():
+            super().setUp()
+
+    def patch_set_rules(self):
+        """Keeps the rules Rules.py made for every location and exit of the HP regions, right before after_set_rules swaps them out."""
+        world_module = sys.modules[ManualWorld.__module__]
+        original_after_set_rules = world_module.after_set_rules
+        self.requires_rules = {}
+
+        def after_set_rules(world, multiworld, player):
+            for region_name in hp_region_percentages:
+                region = multiworld.get_region(region_name, player)
+                for spot in region.locations + region.exits:
+                    self.requires_rules[spot] = spot.access_rule
+
+            original_after_set_rules(world, multiworld, player)
+
+        return patch.object(world_module, "after_set_rules", after_set_rules)
+
+    def check_state(self, state: CollectionState, collected: int):
+        mismatches = [
+            spot.name for spot, requires_rule in self.requires_rules.items() if requires_rule(state) != spot.access_rule(state)
+        ]
+        self.assertEqual([], mismatches, f"after collecting {collected} items")
+
+    def test_ladder_rules_match_requires(self):
+        self.assertTrue(self.requires_rules)
+        world = self.multiworld.worlds[self.player]
+        items = [item for item in self.multiworld.itempool if item.player == self.player]
+
+        # a few random orders, plus one that collects a whole category before the next, so one count is far ahead of the others
+        orders = [Random(seed).sample(items, len(items)) for seed in range(3)]
+        orders.append(sorted(items, key=lambda item: (world.item_name_to_item[item.name].get("category", []), item.name)))
+        step = max(1, len(items) // self.checks_per_order)
+
+        for order in orders:
+            state = CollectionState(self.multiworld)
+            self.check_state(state, 0)
+
+            for index, item in enumerate(order, 1):
+                state.collect(item, True)
+                if index % step == 0 or index == len(order):
+                    self.check_state(state, index)